@@ -7,16 +7,81 @@ Support scraping Xiaohongshu image-text notes
 
 import os
 import sys
+import copy
+import hashlib
 import subprocess
 import json
 import re
+import tempfile
+import threading
+from collections import deque
 import requests
+from functools import lru_cache
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
 from pathlib import Path
 from typing import Optional, Dict
 
+# In-process yt-dlp (avoids paying interpreter startup + extractor loading per call)
+try:
+    from yt_dlp import YoutubeDL
+    USE_YT_DLP_API = True
+except ImportError:
+    YoutubeDL = None
+    USE_YT_DLP_API = False
 
+# Optional fast JSON parser for large embedded page state
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Precompiled patterns
+# Byte pattern: searched against the raw HTML body without decoding it
+_INITIAL_STATE_MARKER = b'window.__INITIAL_STATE__'
+_INITIAL_STATE_RE = re.compile(rb'window\.__INITIAL_STATE__\s*=\s*(\{.*?\});', re.DOTALL)
+_INITIAL_STATE_END = b'};'  # Where the lazy state pattern stops
+_FILENAME_BAD_RE = re.compile(r'[<>:"/\\|?*]')
+_TWEET_ID_RE = re.compile(r'/(?:status|i)/(\d+)')
+_TWEET_USER_RE = re.compile(r'x\.com/([^/]+)/status')
+
+# Per-thread YoutubeDL instances used for metadata lookups (created lazily);
+# YoutubeDL is not thread-safe and batch downloads run on a thread pool
+_YDL_LOCAL = threading.local()
+
+
+def get_ydl() -> "YoutubeDL":
+    """Get this thread's in-process YoutubeDL instance for metadata extraction."""
+    ydl = getattr(_YDL_LOCAL, 'ydl', None)
+    if ydl is None:
+        ydl = _YDL_LOCAL.ydl = YoutubeDL({
+            'quiet': True,
+            'no_warnings': True,
+            'skip_download': True,
+        })
+    return ydl
+
+
+# Directories already created by this process
+_READY_DIRS: set = set()
+
+
+def ensure_dir(path: Path) -> Path:
+    """Create a directory once per process; later calls skip the mkdir syscall."""
+    if path not in _READY_DIRS:
+        path.mkdir(parents=True, exist_ok=True)
+        _READY_DIRS.add(path)
+    return path
+
+
+def url_key(url: str) -> str:
+    """Short, filesystem-safe key for a URL (used for file and checkpoint names)."""
+    return hashlib.blake2b(url.encode('utf-8'), digest_size=4).hexdigest()
+
+
+@lru_cache(maxsize=1)
 def get_yt_dlp_path() -> str:
-    """Get the yt-dlp executable path."""
+    """Get the yt-dlp executable path (resolved once per process)."""
     # Check whether yt-dlp exists inside the virtual environment
     venv_dir = Path(sys.executable).parent
     yt_dlp_venv = venv_dir / "yt-dlp.exe"
@@ -27,12 +92,16 @@ def get_yt_dlp_path() -> str:
     return "yt-dlp"
 
 
-def run_command(cmd: list[str], timeout: int) -> subprocess.CompletedProcess:
-    """Run subprocess commands with UTF-8-safe decoding on Windows."""
+def _utf8_env() -> Dict[str, str]:
+    """Environment that forces UTF-8 output from Python-based tools on Windows."""
     env = os.environ.copy()
     env.setdefault("PYTHONIOENCODING", "utf-8")
     env.setdefault("PYTHONUTF8", "1")
+    return env
+
 
+def run_command(cmd: list[str], timeout: int) -> subprocess.CompletedProcess:
+    """Run subprocess commands with UTF-8-safe decoding on Windows."""
     return subprocess.run(
         cmd,
         capture_output=True,
@@ -40,10 +109,84 @@ def run_command(cmd: list[str], timeout: int) -> subprocess.CompletedProcess:
         encoding="utf-8",
         errors="replace",
         timeout=timeout,
-        env=env,
+        env=_utf8_env(),
     )
 
 
+def stream_command(cmd: list[str], timeout: int, tail_lines: int = 50) -> subprocess.CompletedProcess:
+    """
+    Run a long subprocess while streaming its output.
+    
+    Only the last `tail_lines` lines of stdout/stderr are kept, so memory
+    stays bounded no matter how much progress output the command prints.
+    """
+    stdout_tail: deque = deque(maxlen=tail_lines)
+    stderr_tail: deque = deque(maxlen=tail_lines)
+
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        env=_utf8_env(),
+    ) as proc:
+        # Drain both pipes in the background so neither can fill up and block
+        readers = [
+            threading.Thread(target=tail.extend, args=(pipe,), daemon=True)
+            for tail, pipe in ((stdout_tail, proc.stdout), (stderr_tail, proc.stderr))
+        ]
+        for reader in readers:
+            reader.start()
+        try:
+            returncode = proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            raise
+        finally:
+            for reader in readers:
+                reader.join()
+
+    return subprocess.CompletedProcess(cmd, returncode, "".join(stdout_tail), "".join(stderr_tail))
+
+
+def load_json_command(cmd: list[str], timeout: int) -> Optional[Dict]:
+    """
+    Run a command that prints a JSON document and parse its raw stdout bytes.
+    
+    Skips the text decoding and strip() copies of run_command; json.loads
+    detects UTF-8 from the bytes itself. Returns None on a non-zero exit
+    or empty output.
+    """
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        env=_utf8_env(),
+    ) as proc:
+        # Reading the pipe blocks, so enforce the timeout by killing the process
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+        try:
+            raw = proc.stdout.read()
+        finally:
+            timer.cancel()
+        returncode = proc.wait()
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    if returncode != 0 or not raw or raw.isspace():
+        return None
+    return json.loads(raw)
+
+
 class VideoDownloader:
     """Video downloader with audio-first behavior."""
     
@@ -61,6 +204,16 @@ class VideoDownloader:
         'twitter.com': 'X',
     }
     
+    # yt-dlp CLI flags that print the title once the file is in place,
+    # so no second invocation is needed just to look it up
+    PRINT_TITLE_FLAGS = ('--print', 'after_move:title', '--no-simulate')
+    
+    # yt-dlp CLI flags for a metadata-only Xiaohongshu lookup
+    XHS_INFO_FLAGS = ('--dump-json', '--no-download', '--skip-download')
+    
+    # Number of extracted metadata dicts kept per downloader
+    INFO_CACHE_SIZE = 32
+    
     def __init__(self, output_dir: str = "downloads"):
         """
         Initialize the downloader.
@@ -68,33 +221,62 @@ class VideoDownloader:
         Args:
             output_dir: Audio output directory
         """
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir = ensure_dir(Path(output_dir))
+        
+        # Reusable HTTP session so scrapes keep TCP/TLS connections alive
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            'Accept': 'text/html,application/xhtml+xml',
+        })
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Extracted yt-dlp metadata keyed by URL, reused by later steps
+        # (guarded by a lock: batch runs call the downloader from several threads)
+        self._info_cache: Dict[str, Dict] = {}
+        self._info_lock = threading.Lock()
+    
+    def close(self):
+        """Close the pooled HTTP connections."""
+        self.session.close()
     
-    def detect_platform(self, url: str) -> str:
-        """Detect the target video platform."""
-        for domain, platform in self.PLATFORMS.items():
-            if domain in url.lower():
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def detect_platform(url: str) -> str:
+        """Detect the target video platform from the URL hostname."""
+        # Accept scheme-less input such as "youtu.be/xxx"
+        parsed = urlparse(url if '//' in url else f'//{url}')
+        host = (parsed.hostname or '').removeprefix('www.')
+        
+        platforms = VideoDownloader.PLATFORMS
+        platform = platforms.get(host)
+        if platform:
+            return platform
+        # Subdomains such as m.youtube.com or www.b23.tv
+        for domain, platform in platforms.items():
+            if host.endswith('.' + domain):
                 return platform
         return 'Unknown'
     
     def get_output_path(self, url: str, platform: str) -> Path:
         """Generate the output file path."""
         # Use the URL hash as the filename to avoid special-character issues
-        import hashlib
-        url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
+        url_hash = url_key(url)
         
         # Xiaohongshu uses mp4; other platforms use m4a
         ext = 'mp4' if platform == 'Xiaohongshu' else 'm4a'
         return self.output_dir / f"{platform}_{url_hash}.{ext}"
     
-    def download(self, url: str, force: bool = False) -> Dict:
+    def download(self, url: str, force: bool = False, info: Optional[Dict] = None) -> Dict:
         """
         Download video audio.
         
         Args:
             url: Video URL
             force: Whether to force a fresh download
+            info: Metadata already extracted for this URL; skips re-extraction
             
         Returns:
             A dictionary containing the audio path, platform, and video title
@@ -105,18 +287,34 @@ class VideoDownloader:
         # Return immediately if the file already exists and re-download is not forced
         if output_path.exists() and not force:
             print(f"📁 File already exists: {output_path}")
+            # The title was stored next to the media on the first download
+            sidecar = self._read_sidecar(output_path)
             return {
                 'audio_path': str(output_path),
                 'platform': platform,
-                'title': output_path.stem,
+                'title': sidecar.get('title') or output_path.stem,
                 'url': url
             }
         
         print(f"⬇️ Starting download: {url}")
         print(f"📍 Platform: {platform}")
         
+        if USE_YT_DLP_API:
+            return self._download_with_api(url, platform, output_path, info)
+        
         yt_dlp = get_yt_dlp_path()
         
+        # Reuse already-extracted metadata instead of re-fetching the page
+        info_file = None
+        source = [url]
+        if info:
+            with tempfile.NamedTemporaryFile(
+                'w', suffix='.info.json', encoding='utf-8', delete=False
+            ) as f:
+                json.dump(info, f, ensure_ascii=False)
+                info_file = f.name
+            source = ['--load-info-json', info_file]
+        
         # ========== Platform-specific settings ==========
         if platform == 'Xiaohongshu':
             # Xiaohongshu: download the full video and keep the video track
@@ -125,7 +323,8 @@ class VideoDownloader:
                 '-f', 'best',
                 '--merge-output-format', 'mp4',
                 '-o', str(output_path),
-                url
+                *self.PRINT_TITLE_FLAGS,
+                *source
             ]
         elif platform == 'Bilibili':
             # Bilibili: download audio only
@@ -135,7 +334,8 @@ class VideoDownloader:
                 '--audio-format', 'm4a',
                 '--audio-quality', '0',
                 '-o', str(output_path),
-                url
+                *self.PRINT_TITLE_FLAGS,
+                *source
             ]
         else:
             # YouTube and other platforms: download audio only
@@ -145,26 +345,21 @@ class VideoDownloader:
                 '--audio-format', 'm4a',
                 '-o', str(output_path),
                 '--no-playlist',
-                url
+                *self.PRINT_TITLE_FLAGS,
+                *source
             ]
         
         try:
-            result = run_command(cmd, timeout=600)
+            result = stream_command(cmd, timeout=600)
             
             if result.returncode != 0:
                 raise Exception(f"Download failed: {result.stderr}")
             
-            # Retrieve the video title
-            title = self._get_title(url) or output_path.stem
-            
-            print(f"✅ Download complete: {output_path.name}")
+            # The title is printed by the download itself (see PRINT_TITLE_FLAGS)
+            lines = result.stdout.strip().splitlines()
+            title = (lines and self._sanitize_title(lines[-1].strip())) or output_path.stem
             
-            return {
-                'audio_path': str(output_path),
-                'platform': platform,
-                'title': title,
-                'url': url
-            }
+            return self._finish_download(url, platform, output_path, title)
             
         except subprocess.TimeoutExpired:
             raise Exception("Download timed out (over 10 minutes)")
@@ -172,10 +367,97 @@ class VideoDownloader:
             raise Exception("yt-dlp is not installed. Run: pip install yt-dlp")
         except Exception as e:
             raise Exception(f"Download failed: {str(e)}")
+        finally:
+            if info_file:
+                os.remove(info_file)
+    
+    def _build_ydl_opts(self, platform: str, output_path: Path) -> Dict:
+        """Build in-process yt-dlp options equivalent to the CLI flags."""
+        opts = {
+            'outtmpl': str(output_path),
+            'quiet': True,
+            'no_warnings': True,
+            'noprogress': True,
+            'socket_timeout': 30,
+        }
+        if platform == 'Xiaohongshu':
+            # Xiaohongshu: download the full video and keep the video track
+            opts.update({'format': 'best', 'merge_output_format': 'mp4'})
+        elif platform == 'Bilibili':
+            # Bilibili: download audio only
+            opts.update({'format': 'bestaudio'})
+        else:
+            # YouTube and other platforms: download audio only
+            opts.update({'format': 'bestaudio', 'noplaylist': True})
+        return opts
+    
+    def _download_with_api(self, url: str, platform: str, output_path: Path, info: Optional[Dict] = None) -> Dict:
+        """Download through the in-process YoutubeDL API instead of a subprocess."""
+        try:
+            with YoutubeDL(self._build_ydl_opts(platform, output_path)) as ydl:
+                if info:
+                    # Materialize the already-extracted metadata without re-extracting
+                    info = ydl.process_ie_result(copy.deepcopy(info), download=True)
+                else:
+                    info = ydl.extract_info(url, download=True)
+            
+            # The extracted metadata already carries the title
+            title = self._sanitize_title((info or {}).get('title') or '') or output_path.stem
+            
+            return self._finish_download(url, platform, output_path, title)
+            
+        except Exception as e:
+            raise Exception(f"Download failed: {str(e)}")
+    
+    def _finish_download(self, url: str, platform: str, output_path: Path, title: str) -> Dict:
+        """Record a finished download and build the result dictionary."""
+        print(f"✅ Download complete: {output_path.name}")
+        
+        result = {
+            'audio_path': str(output_path),
+            'platform': platform,
+            'title': title,
+            'url': url
+        }
+        self._write_sidecar(output_path, {'title': title, 'url': url, 'platform': platform})
+        return result
+    
+    @staticmethod
+    def _sidecar_path(output_path: Path) -> Path:
+        """Metadata file stored next to a downloaded media file."""
+        return output_path.with_suffix('.json')
+    
+    def _write_sidecar(self, output_path: Path, metadata: Dict):
+        """Atomically write the metadata sidecar so cache hits know the title."""
+        sidecar = self._sidecar_path(output_path)
+        tmp_path = sidecar.with_suffix('.json.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, ensure_ascii=False)
+            os.replace(tmp_path, sidecar)
+        except Exception as e:
+            print(f"⚠️ Failed to write metadata sidecar: {e}")
+    
+    def _read_sidecar(self, output_path: Path) -> Dict:
+        """Read the metadata sidecar; returns an empty dict when missing."""
+        try:
+            with open(self._sidecar_path(output_path), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
     
     def _get_title(self, url: str) -> Optional[str]:
-        """Get the video title."""
+        """
+        Get the video title with a separate metadata lookup.
+        
+        Deprecated for the download path: download() now reads the title
+        from the download itself. Kept for callers that only need a title.
+        """
         try:
+            if USE_YT_DLP_API:
+                info = get_ydl().extract_info(url, download=False)
+                return self._sanitize_title(info.get('title') or '')
+            
             cmd = [
                 get_yt_dlp_path(),
                 '--get-title',
@@ -184,66 +466,55 @@ class VideoDownloader:
             ]
             result = run_command(cmd, timeout=30)
             if result.returncode == 0:
-                title = result.stdout.strip()
-                # Remove characters that are invalid in filenames
-                title = re.sub(r'[<>:"/\\|?*]', '_', title)
-                return title[:100]  # Keep the filename length bounded
+                return self._sanitize_title(result.stdout.strip())
         except:
             pass
         return None
     
+    @staticmethod
+    def _sanitize_title(title: str) -> Optional[str]:
+        """Remove characters that are invalid in filenames."""
+        if not title:
+            return None
+        title = _FILENAME_BAD_RE.sub('_', title)
+        return title[:100]  # Keep the filename length bounded
+    
     def cleanup(self, audio_path: str):
-        """Delete the temporary audio file."""
+        """Delete the temporary audio file and its metadata sidecar."""
         try:
             if os.path.exists(audio_path):
                 os.remove(audio_path)
                 print(f"🗑️ Cleaned up: {audio_path}")
+            sidecar = self._sidecar_path(Path(audio_path))
+            if sidecar.exists():
+                sidecar.unlink()
         except Exception as e:
             print(f"⚠️ Cleanup failed: {e}")
 
-    def scrape_xiaohongshu(self, url: str) -> Dict:
+    def scrape_xiaohongshu(self, url: str, use_extractor: bool = True) -> Dict:
         """
         Scrape Xiaohongshu image-text note content.
         
         Args:
             url: Xiaohongshu URL
+            use_extractor: Run yt-dlp if no metadata is cached yet; pass False
+                when extraction already failed for this URL
             
         Returns:
             A dictionary containing the title, description, images, and comments
         """
         print("📝 No video detected, trying to scrape image-text content...")
         
-        # Attempt 1: use yt-dlp --dump-json to fetch metadata
+        # Attempt 1: use yt-dlp metadata (cached when download_or_scrape already fetched it)
         try:
-            yt_dlp = get_yt_dlp_path()
-            cmd = [yt_dlp, '--dump-json', '--no-download', url]
-            
-            result = run_command(cmd, timeout=60)
+            if use_extractor:
+                data = self._extract_info(url, self.XHS_INFO_FLAGS)
+            else:
+                with self._info_lock:
+                    data = self._info_cache.get(url)
             
-            if result.returncode == 0 and result.stdout.strip():
-                data = json.loads(result.stdout.strip())
-                
-                title = data.get('title', '')
-                description = data.get('description', '') or data.get('title', '')
-                uploader = data.get('uploader', '未知作者')
-                
-                # Try to collect image URLs
-                images = []
-                if 'thumbnails' in data:
-                    for thumb in data.get('thumbnails', []):
-                        if 'url' in thumb:
-                            images.append(thumb['url'])
-                
-                result_dict = {
-                    'type': 'image_text',
-                    'title': title or description[:50] or '小红书笔记',
-                    'description': description,
-                    'author': uploader,
-                    'images': images,
-                    'comments': [],
-                    'url': url
-                }
-                
+            if data:
+                result_dict = self._image_text_from_info(data, url)
                 print(f"✅ Image-text scrape succeeded (yt-dlp): {result_dict['title']}")
                 return result_dict
         except Exception as e:
@@ -251,16 +522,33 @@ class VideoDownloader:
         
         # Attempt 2: request and parse the webpage directly
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'Accept': 'text/html,application/xhtml+xml',
-            }
-            response = requests.get(url, headers=headers, timeout=30)
+            # Stream the page and stop reading once the embedded state is complete
+            json_match = None
+            with self.session.get(url, stream=True, timeout=30) as response:
+                buf = bytearray()
+                start = -1
+                scanned = 0  # Bytes already searched; each chunk only scans what is new
+                for chunk in response.iter_content(chunk_size=65536):
+                    buf.extend(chunk)
+                    if start < 0:
+                        # Overlap by the marker length for a marker split across chunks
+                        start = buf.find(_INITIAL_STATE_MARKER, max(0, scanned - len(_INITIAL_STATE_MARKER)))
+                        if start < 0:
+                            scanned = len(buf)
+                            continue
+                        scanned = start
+                    # The state object is complete once a "};" follows the marker;
+                    # only then run the regex (once), instead of on every chunk
+                    if buf.find(_INITIAL_STATE_END, max(start, scanned - len(_INITIAL_STATE_END))) >= 0:
+                        json_match = _INITIAL_STATE_RE.search(buf, start)
+                        if json_match:
+                            break
+                    scanned = len(buf)
             
             # Extract JSON data from the HTML
-            json_match = re.search(r'window\.__INITIAL_STATE__\s*=\s*(\{.*?\});', response.text, re.DOTALL)
             if json_match:
-                data = json.loads(json_match.group(1))
+                state = json_match.group(1)
+                data = orjson.loads(state) if orjson is not None else json.loads(state)
                 # Parse the note payload...
                 print("✅ Image-text scrape succeeded (page parsing)")
         except Exception as e:
@@ -281,26 +569,34 @@ class VideoDownloader:
         """
         platform = self.detect_platform(url)
         
-        # Xiaohongshu: inspect metadata first to determine video vs. image-text
+        # Xiaohongshu: one metadata extraction decides video vs. image-text
+        # and is reused for the download and for any scraping fallback
         if platform == 'Xiaohongshu':
-            # Use --dump-json first to determine the content type
             try:
-                result = self._get_xiaohongshu_info(url)
-                if result.get('has_video', True):
-                    # Video present: proceed with the normal download flow
-                    return self.download(url, force)
-                else:
-                    # No video: return the image-text payload
-                    print("📝 Detected image-text note")
-                    return result
+                info = self._extract_info(url, self.XHS_INFO_FLAGS)
+                if not info:
+                    raise Exception("Unable to retrieve note information")
             except Exception as e:
                 print(f"⚠️ Failed to fetch metadata: {e}. Trying direct download...")
                 try:
                     return self.download(url, force)
                 except:
-                    # Download failed, so fall back to scraping image-text content
+                    # Download failed, so fall back to scraping the page itself
                     print("💡 Trying to scrape image-text content...")
-                    return self.scrape_xiaohongshu(url)
+                    return self.scrape_xiaohongshu(url, use_extractor=False)
+            
+            if not self._has_video(info):
+                # No video: build the image-text payload from the same metadata
+                print("📝 Detected image-text note")
+                return self._image_text_from_info(info, url)
+            
+            try:
+                # Video present: download from the metadata fetched above
+                return self.download(url, force, info=info)
+            except Exception as e:
+                print(f"⚠️ Download failed: {e}")
+                print("💡 Trying to scrape image-text content...")
+                return self.scrape_xiaohongshu(url)
         
         # X (Twitter): try download first, then fall back to scraping
         if platform == 'X':
@@ -323,41 +619,59 @@ class VideoDownloader:
         # Other platforms go through the normal download flow
         return self.download(url, force)
     
-    def _get_xiaohongshu_info(self, url: str) -> Dict:
-        """Get Xiaohongshu note metadata and determine whether it includes video."""
-        yt_dlp = get_yt_dlp_path()
-        cmd = [yt_dlp, '--dump-json', '--no-download', '--skip-download', url]
-
-        result = run_command(cmd, timeout=60)
+    @staticmethod
+    def _has_video(info: Dict) -> bool:
+        """Determine whether extracted metadata includes a video stream."""
+        return bool(info.get('formats')) or (info.get('duration') or 0) > 0
 
-        if result.returncode == 0 and result.stdout.strip():
-            data = json.loads(result.stdout.strip())
+    @staticmethod
+    def _image_text_from_info(data: Dict, url: str) -> Dict:
+        """Build the image-text payload from extracted Xiaohongshu metadata."""
+        title = data.get('title', '')
+        description = data.get('description', '') or data.get('title', '')
+        uploader = data.get('uploader', '未知作者')
 
-            title = data.get('title', '')
-            description = data.get('description', '') or data.get('title', '')
-            uploader = data.get('uploader', '未知作者')
+        # Collect image URLs
+        images = []
+        for thumb in data.get('thumbnails') or []:
+            if 'url' in thumb:
+                images.append(thumb['url'])
 
-            # Determine whether a video stream is present
-            has_video = bool(data.get('formats')) or data.get('duration', 0) > 0
+        return {
+            'type': 'image_text',
+            'title': title or description[:50] or '小红书笔记',
+            'description': description,
+            'author': uploader,
+            'images': images,
+            'comments': [],
+            'url': url
+        }
 
-            # Collect image URLs
-            images = []
-            for thumb in data.get('thumbnails', []):
-                if 'url' in thumb:
-                    images.append(thumb['url'])
+    def _extract_info(self, url: str, cli_flags: tuple) -> Optional[Dict]:
+        """
+        Extract metadata without downloading.
+        
+        Uses this thread's in-process YoutubeDL instance when available and
+        falls back to the yt-dlp CLI with the given flags otherwise.
+        Results are cached per URL so later steps do not hit the site again.
+        """
+        with self._info_lock:
+            data = self._info_cache.get(url)
+        if data is not None:
+            return data
 
-            return {
-                'type': 'image_text',
-                'has_video': has_video,
-                'title': title or description[:50] or '小红书笔记',
-                'description': description,
-                'author': uploader,
-                'images': images,
-                'comments': [],
-                'url': url
-            }
+        if USE_YT_DLP_API:
+            data = get_ydl().extract_info(url, download=False)
+        else:
+            data = load_json_command([get_yt_dlp_path(), *cli_flags, url], timeout=60)
 
-        raise Exception("Unable to retrieve note information")
+        if data:
+            with self._info_lock:
+                if url not in self._info_cache and len(self._info_cache) >= self.INFO_CACHE_SIZE:
+                    # Evict the oldest entry (dicts keep insertion order)
+                    self._info_cache.pop(next(iter(self._info_cache)))
+                self._info_cache[url] = data
+        return data
 
     def scrape_x_tweet(self, url: str) -> Dict:
         """
@@ -372,8 +686,8 @@ class VideoDownloader:
         print("📝 Detected an X post, trying to scrape content...")
         
         # Extract the tweet ID and username
-        tweet_id_match = re.search(r'/(?:status|i)/(\d+)', url)
-        username_match = re.search(r'x\.com/([^/]+)/status', url)
+        tweet_id_match = _TWEET_ID_RE.search(url)
+        username_match = _TWEET_USER_RE.search(url)
         
         tweet_id = tweet_id_match.group(1) if tweet_id_match else None
         username = username_match.group(1) if username_match else None
@@ -383,7 +697,7 @@ class VideoDownloader:
             try:
                 print("🔄 Trying the vxtwitter API...")
                 vx_url = f"https://api.vxtwitter.com/{username}/status/{tweet_id}"
-                response = requests.get(vx_url, timeout=30)
+                response = self.session.get(vx_url, timeout=30)
                 if response.status_code == 200:
                     data = response.json()
                     description = data.get('text', '')
@@ -409,7 +723,7 @@ class VideoDownloader:
             try:
                 print("🔄 Trying the fxtwitter API...")
                 fx_url = f"https://api.fxtwitter.com/{username}/status/{tweet_id}"
-                response = requests.get(fx_url, timeout=30)
+                response = self.session.get(fx_url, timeout=30)
                 if response.status_code == 200:
                     data = response.json()
                     tweet_data = data.get('tweet', {})
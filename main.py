@@ -20,8 +20,14 @@ load_dotenv(Path(__file__).parent / ".env")
 
 import sys
 import json
+import time
+import asyncio
+import atexit
+import queue
 import argparse
 import logging
+import logging.handlers
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
@@ -29,12 +35,18 @@ from typing import Optional
 # Add the current directory to sys.path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from downloader import VideoDownloader
+from downloader import VideoDownloader, ensure_dir, url_key
 from transcriber import WhisperTranscriber
 from summarizer import Summarizer
 from transcript_cleaner import TranscriptCleaner
 from notion_writer import NotionWriter, MockNotionWriter
 
+# Optional fast JSON encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 # ==================== Configuration ====================
 
@@ -52,6 +64,8 @@ class Config:
     
     # Transcription settings
     TRANSCRIBE_LANGUAGE = "zh"  # Prefer Chinese by default
+    WHISPER_QUALITY = os.getenv("WHISPER_QUALITY", "fast")  # "fast" = greedy decoding, "accurate" = beam search
+    WHISPER_PRE_VAD = os.getenv("WHISPER_PRE_VAD", "0").lower() in {"1", "true", "yes", "on"}  # Silero speech pre-filter
     ENABLE_TRANSCRIPT_CLEANING = os.getenv("ENABLE_TRANSCRIPT_CLEANING", "1").lower() in {"1", "true", "yes", "on"}
     MAX_TRANSCRIPT_LENGTH = 5000  # Maximum LLM input length before Notion write
     
@@ -62,13 +76,32 @@ class Config:
     
     # Cleanup settings
     CLEANUP_AUDIO = True  # Delete the downloaded audio after processing
+    
+    # Batch settings
+    BATCH_DOWNLOAD_WORKERS = 4  # Concurrent downloads when processing several URLs
+
+
+# ==================== JSON ====================
+
+def dumps_json(obj) -> bytes:
+    """Serialize to indented UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def loads_json(data: bytes):
+    """Parse UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 # ==================== Logging ====================
 
 def setup_logging(log_level: str = "INFO") -> logging.Logger:
     """Set up the logging system."""
-    Config.LOG_DIR.mkdir(parents=True, exist_ok=True)
+    ensure_dir(Config.LOG_DIR)
     
     logger = logging.getLogger("VideoPipeline")
     logger.setLevel(getattr(logging, log_level.upper()))
@@ -86,8 +119,15 @@ def setup_logging(log_level: str = "INFO") -> logging.Logger:
         logging.Formatter('%(levelname)s: %(message)s')
     )
     
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Handlers run on a background listener thread; the hot path only enqueues records
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)  # Flush pending records at exit
+    
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
     
     return logger
 
@@ -126,21 +166,62 @@ class VideoPipeline:
             self.notion_writer = MockNotionWriter()
         
         # Checkpoint directory
-        self.checkpoint_dir = Config.PROJECT_DIR / "checkpoints"
-        self.checkpoint_dir.mkdir(exist_ok=True)
+        self.checkpoint_dir = ensure_dir(Config.PROJECT_DIR / "checkpoints")
+        
+        # When True, models stay resident between URLs (see prepare/release)
+        self._keep_models_loaded = False
+    
+    def prepare(self, load_whisper: bool = True, warm_up_llm: bool = True):
+        """
+        Load models once so that several URLs can reuse them.
+        
+        Args:
+            load_whisper: Load the Whisper model up front
+            warm_up_llm: Send a warm-up request to the LLM
+        """
+        self._keep_models_loaded = True
+        if load_whisper:
+            try:
+                self.transcriber.load_model()
+            except Exception as e:
+                # Per-URL transcription retries (including CPU fallback) still apply
+                self.logger.warning(f"⚠️ Preloading Whisper failed: {e}")
+        if warm_up_llm:
+            self.summarizer.load_model()
+    
+    def release(self):
+        """Unload models kept resident by prepare()."""
+        self._keep_models_loaded = False
+        self.transcriber.unload_model()
+        self.summarizer.unload_model()
+    
+    def __enter__(self):
+        """Context manager entry point that keeps models loaded."""
+        self.prepare()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit point that releases the models."""
+        self.release()
     
     def _get_checkpoint_path(self, url: str) -> Path:
         """Get the checkpoint file path."""
-        import hashlib
-        url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
-        return self.checkpoint_dir / f"{url_hash}.json"
+        return self.checkpoint_dir / f"{url_key(url)}.json"
     
     def _save_checkpoint(self, result: dict):
-        """Save a processing checkpoint."""
+        """
+        Save a processing checkpoint.
+        
+        Only written after transcription (the long step worth resuming past)
+        and on failure; a successful run removes it anyway. The file is
+        replaced atomically so a crash never leaves a torn checkpoint.
+        """
         try:
             checkpoint_path = self._get_checkpoint_path(result['url'])
-            with open(checkpoint_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
+            tmp_path = checkpoint_path.with_suffix('.json.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.write(dumps_json(result))
+            os.replace(tmp_path, checkpoint_path)
             self.logger.info(f"💾 Checkpoint saved: {checkpoint_path.name}")
         except Exception as e:
             self.logger.warning(f"Failed to save checkpoint: {e}")
@@ -150,8 +231,8 @@ class VideoPipeline:
         try:
             checkpoint_path = self._get_checkpoint_path(url)
             if checkpoint_path.exists():
-                with open(checkpoint_path, 'r', encoding='utf-8') as f:
-                    result = json.load(f)
+                with open(checkpoint_path, 'rb') as f:
+                    result = loads_json(f.read())
                 # Skip already completed tasks
                 if result.get('status') == 'success':
                     self.logger.info("✓ Task already completed. Skipping.")
@@ -174,6 +255,111 @@ class VideoPipeline:
         Returns:
             A dictionary containing all processing results
         """
+        result = self._begin(url, resume)
+        
+        try:
+            audio_path = self._download_step(result)
+            self._transcribe_step(result, audio_path, skip_transcribe)
+            self._summarize_step(result, skip_summary)
+            self._notion_step(result)
+            return self._complete(result)
+            
+        except Exception as e:
+            self._record_failure(result, e)
+            raise
+    
+    def run_many(self, urls: list[str], skip_transcribe: bool = False, skip_summary: bool = False, resume: bool = True) -> list[dict]:
+        """
+        Run the workflow for several URLs, overlapping IO-bound stages.
+        
+        The stages form a producer/consumer pipeline: downloads run on a
+        small thread pool, a single worker drains them for transcription
+        and summarization (so GPU work stays sequential), and a Notion
+        worker writes each item as soon as its GPU work is done.
+        Models are loaded once and stay resident for the whole batch.
+        
+        Args:
+            urls: Video URLs (duplicates are processed once)
+            skip_transcribe: Skip transcription (useful for testing)
+            skip_summary: Skip summarization
+            resume: Whether to resume from checkpoints (default: True)
+            
+        Returns:
+            One result dictionary per unique URL, in input order
+        """
+        urls = list(dict.fromkeys(urls))
+        
+        # One paginated query replaces a duplicate lookup per URL
+        if self.notion_writer:
+            try:
+                self.notion_writer.prefetch_existing_urls()
+            except Exception as e:
+                self.logger.warning(f"⚠️ Prefetching existing Notion URLs failed: {e}")
+        
+        # Load models once for the whole batch instead of once per URL
+        self.prepare(load_whisper=not skip_transcribe, warm_up_llm=not skip_summary)
+        try:
+            return asyncio.run(self._run_many(urls, skip_transcribe, skip_summary, resume))
+        finally:
+            self.release()
+    
+    async def _run_many(self, urls: list[str], skip_transcribe: bool, skip_summary: bool, resume: bool) -> list[dict]:
+        loop = asyncio.get_running_loop()
+        results = [self._begin(url, resume) for url in urls]
+        failed = set()
+        to_transcribe: asyncio.Queue = asyncio.Queue()
+        to_notion: asyncio.Queue = asyncio.Queue()
+        
+        # Downloads are network-bound (and yt-dlp releases the GIL), so a small pool is enough
+        with ThreadPoolExecutor(max_workers=Config.BATCH_DOWNLOAD_WORKERS, thread_name_prefix="download") as download_pool:
+            
+            async def download_stage(index: int):
+                result = results[index]
+                audio_path = None
+                try:
+                    audio_path = await loop.run_in_executor(download_pool, self._download_step, result)
+                except Exception as e:
+                    self._record_failure(result, e)
+                    failed.add(index)
+                await to_transcribe.put((index, audio_path))
+            
+            async def gpu_worker():
+                # Single consumer: transcription and summarization never overlap on the GPU
+                for _ in range(len(urls)):
+                    index, audio_path = await to_transcribe.get()
+                    if index not in failed:
+                        result = results[index]
+                        try:
+                            await asyncio.to_thread(self._transcribe_step, result, audio_path, skip_transcribe)
+                            await asyncio.to_thread(self._summarize_step, result, skip_summary)
+                        except Exception as e:
+                            self._record_failure(result, e)
+                            failed.add(index)
+                    await to_notion.put(index)
+            
+            async def notion_worker():
+                # Writes each finished item while the GPU worker moves on to the next one
+                for _ in range(len(urls)):
+                    index = await to_notion.get()
+                    if index in failed:
+                        continue
+                    result = results[index]
+                    try:
+                        await asyncio.to_thread(self._notion_step, result)
+                        self._complete(result)
+                    except Exception as e:
+                        self._record_failure(result, e)
+            
+            await asyncio.gather(
+                gpu_worker(),
+                notion_worker(),
+                *(download_stage(i) for i in range(len(urls))),
+            )
+        
+        return results
+    
+    def _begin(self, url: str, resume: bool) -> dict:
+        """Start processing a URL, resuming from its checkpoint when allowed."""
         self.logger.info("=" * 50)
         self.logger.info(f"🚀 Starting processing: {url}")
         self.logger.info("=" * 50)
@@ -197,282 +383,295 @@ class VideoPipeline:
                 'start_time': datetime.now().isoformat(),
                 'steps': {}
             }
+        return result
+    
+    def _download_step(self, result: dict) -> Optional[str]:
+        """
+        Step 1: download audio or scrape image-text content.
         
-        try:
-            # ========== Step 1: Download audio or scrape image-text content ==========
-            self.logger.info("\n📍 Step 1: Download or scrape content")
-            self.logger.info("-" * 30)
+        Returns:
+            The audio path for video content, or None for image-text notes
+        """
+        self.logger.info("\n📍 Step 1: Download or scrape content")
+        self.logger.info("-" * 30)
+        
+        # Try downloading the video first; fall back to scraping if needed
+        download_result = self.downloader.download_or_scrape(result['url'])
+        
+        # Determine the content type
+        content_type = download_result.get('type', 'video')
+        
+        if content_type == 'image_text':
+            # Image-text note: use the scraped text content directly
+            self.logger.info("📝 Detected image-text note")
             
-            # Try downloading the video first; fall back to scraping if needed
-            download_result = self.downloader.download_or_scrape(url)
+            result['steps']['download'] = {
+                'status': 'success',
+                'type': 'image_text',
+                'platform': 'Xiaohongshu',
+                'title': download_result['title']
+            }
+            result['title'] = download_result['title']
+            result['platform'] = 'Xiaohongshu'
+            result['content_type'] = 'image_text'
             
-            # Determine the content type
-            content_type = download_result.get('type', 'video')
+            # Convert image-text content into transcript-like text
+            text_content = download_result.get('description', '')
+            if download_result.get('comments'):
+                text_content += '\n\n评论:\n'
+                for c in download_result['comments']:
+                    text_content += f"- {c['user']}: {c['text']}\n"
             
-            if content_type == 'image_text':
-                # Image-text note: use the scraped text content directly
-                self.logger.info("📝 Detected image-text note")
-                
-                result['steps']['download'] = {
-                    'status': 'success',
-                    'type': 'image_text',
-                    'platform': 'Xiaohongshu',
-                    'title': download_result['title']
-                }
-                result['title'] = download_result['title']
-                result['platform'] = 'Xiaohongshu'
-                result['content_type'] = 'image_text'
-                
-                # Convert image-text content into transcript-like text
-                text_content = download_result.get('description', '')
-                if download_result.get('comments'):
-                    text_content += '\n\n评论:\n'
-                    for c in download_result['comments']:
-                        text_content += f"- {c['user']}: {c['text']}\n"
-                
-                result['transcript'] = text_content
-                result['image_text_data'] = download_result
-                self._save_checkpoint(result)
-                
-                audio_path = None
-            else:
-                # Standard video content
-                audio_path = download_result['audio_path']
-                
-                result['steps']['download'] = {
-                    'status': 'success',
-                    'audio_path': audio_path,
-                    'platform': download_result['platform'],
-                    'title': download_result['title']
-                }
-                result['title'] = download_result['title']
-                result['platform'] = download_result['platform']
-                self._save_checkpoint(result)
+            result['transcript'] = text_content
+            result['image_text_data'] = download_result
             
-            # ========== Step 2: Transcription (video content only) ==========
-            if content_type == 'image_text':
-                self.logger.info("⏭️ Image-text note detected, skipping speech transcription")
-                result['steps']['transcribe'] = {'status': 'skipped', 'reason': 'image_text'}
-            elif not skip_transcribe:
-                self.logger.info("\n📍 Step 2: Speech to text (Whisper)")
-                self.logger.info("-" * 30)
-                
-                # Retry on failure and automatically fall back to CPU
-                max_retries = 3
-                retry_delay = 5  # seconds
-                last_error = None
-                transcript_result = None
-                
-                for attempt in range(max_retries):
-                    attempted_device = None
-                    try:
-                        # Auto-detect device (CUDA/CPU)
+            return None
+        
+        # Standard video content
+        audio_path = download_result['audio_path']
+        
+        result['steps']['download'] = {
+            'status': 'success',
+            'audio_path': audio_path,
+            'platform': download_result['platform'],
+            'title': download_result['title']
+        }
+        result['title'] = download_result['title']
+        result['platform'] = download_result['platform']
+        return audio_path
+    
+    def _transcribe_step(self, result: dict, audio_path: Optional[str], skip_transcribe: bool):
+        """Step 2: transcribe the audio (video content only), then clean up the audio file."""
+        if result.get('content_type') == 'image_text':
+            self.logger.info("⏭️ Image-text note detected, skipping speech transcription")
+            result['steps']['transcribe'] = {'status': 'skipped', 'reason': 'image_text'}
+        elif not skip_transcribe:
+            self.logger.info("\n📍 Step 2: Speech to text (Whisper)")
+            self.logger.info("-" * 30)
+            
+            # Retry on failure and automatically fall back to CPU
+            max_retries = 3
+            retry_delay = 5  # seconds
+            last_error = None
+            transcript_result = None
+            
+            for attempt in range(max_retries):
+                attempted_device = None
+                try:
+                    # Auto-detect device (CUDA/CPU)
+                    if not self.transcriber.loaded:
                         self.logger.info(f"🔄 Trying to load Whisper (auto-detect) - attempt {attempt + 1}/{max_retries}")
                         self.transcriber.load_model()
-                        active_device = self.transcriber.last_device or 'unknown'
-                        attempted_device = active_device
-                        self.logger.info(f"🖥️ Whisper device selected: {active_device}")
-                        
-                        # Run transcription
-                        transcript_result = self.transcriber.transcribe(
-                            audio_path,
-                            language=Config.TRANSCRIBE_LANGUAGE
-                        )
-                        
-                        # Unload the model to free VRAM
-                        self.transcriber.unload_model()
-                        
-                        result['steps']['transcribe'] = {
-                            'status': 'success',
-                            'text_length': len(transcript_result['text']),
-                            'duration': transcript_result['duration'],
-                            'language': transcript_result['language'],
-                            'device': active_device
-                        }
-                        result['transcript'] = transcript_result['text']
-                        self._save_checkpoint(result)
-                        break  # Success: exit the retry loop
-                        
-                    except Exception as transcribe_error:
-                        last_error = transcribe_error
-                        attempted_device = attempted_device or self.transcriber.last_device or 'auto-detect'
-                        self.logger.warning(f"⚠️ Transcription failed on {attempted_device}: {transcribe_error}")
+                    active_device = self.transcriber.last_device or 'unknown'
+                    attempted_device = active_device
+                    self.logger.info(f"🖥️ Whisper device selected: {active_device}")
+                    
+                    # Run transcription
+                    transcript_result = self.transcriber.transcribe(
+                        audio_path,
+                        language=Config.TRANSCRIBE_LANGUAGE,
+                        quality_mode=Config.WHISPER_QUALITY,
+                        pre_vad=Config.WHISPER_PRE_VAD
+                    )
+                    
+                    # Unload the model to free VRAM unless a batch keeps it resident
+                    if not self._keep_models_loaded:
                         self.transcriber.unload_model()
-
-                        if attempted_device != 'cpu':
-                            # Fall back to CPU explicitly to avoid retrying the same auto-detected path
-                            try:
-                                self.logger.info("🔄 Falling back to CPU...")
-                                self.transcriber.load_model(device="cpu", compute_type="int8")
-                                
-                                transcript_result = self.transcriber.transcribe(
-                                    audio_path,
-                                    language=Config.TRANSCRIBE_LANGUAGE
-                                )
-                                
-                                self.transcriber.unload_model()
-                                
-                                result['steps']['transcribe'] = {
-                                    'status': 'success',
-                                    'text_length': len(transcript_result['text']),
-                                    'duration': transcript_result['duration'],
-                                    'language': transcript_result['language'],
-                                    'device': self.transcriber.last_device or 'cpu'
-                                }
-                                result['transcript'] = transcript_result['text']
-                                self._save_checkpoint(result)
-                                self.logger.info("✅ CPU fallback transcription succeeded!")
-                                break
-                                
-                            except Exception as cpu_error:
-                                last_error = cpu_error
-                                self.logger.warning(f"⚠️ CPU fallback also failed: {cpu_error}")
-                                self.transcriber.unload_model()
-                        else:
-                            self.logger.info("ℹ️ Auto-detect already selected CPU; skipping redundant CPU fallback")
-                        
-                        # Wait before retrying unless this was the last attempt
-                        if attempt < max_retries - 1:
-                            self.logger.info(f"⏳ Retrying in {retry_delay} seconds...")
-                            import time
-                            time.sleep(retry_delay)
-                            retry_delay *= 2  # Exponential backoff
-                
-                else:
-                    # All retry attempts failed
-                    self.logger.error(f"❌ Transcription still failed after {max_retries} retries: {last_error}")
+                    
                     result['steps']['transcribe'] = {
-                        'status': 'error',
-                        'error': str(last_error)
+                        'status': 'success',
+                        'text_length': len(transcript_result['text']),
+                        'duration': transcript_result['duration'],
+                        'language': transcript_result['language'],
+                        'device': active_device
                     }
-                    raise last_error
-            else:
-                self.logger.info("⏭️ Skipping transcription step")
-            
-            # ========== Step 3: Clean up audio files ==========
-            if Config.CLEANUP_AUDIO and audio_path:
-                self.downloader.cleanup(audio_path)
+                    result['transcript'] = transcript_result['text']
+                    self._save_checkpoint(result)
+                    break  # Success: exit the retry loop
+                    
+                except Exception as transcribe_error:
+                    last_error = transcribe_error
+                    attempted_device = attempted_device or self.transcriber.last_device or 'auto-detect'
+                    self.logger.warning(f"⚠️ Transcription failed on {attempted_device}: {transcribe_error}")
+                    self.transcriber.unload_model()
+
+                    if attempted_device != 'cpu':
+                        # Fall back to CPU explicitly to avoid retrying the same auto-detected path
+                        try:
+                            self.logger.info("🔄 Falling back to CPU...")
+                            self.transcriber.load_model(device="cpu", compute_type="int8")
+                            
+                            transcript_result = self.transcriber.transcribe(
+                                audio_path,
+                                language=Config.TRANSCRIBE_LANGUAGE,
+                                quality_mode=Config.WHISPER_QUALITY,
+                                pre_vad=Config.WHISPER_PRE_VAD
+                            )
+                            
+                            self.transcriber.unload_model()
+                            
+                            result['steps']['transcribe'] = {
+                                'status': 'success',
+                                'text_length': len(transcript_result['text']),
+                                'duration': transcript_result['duration'],
+                                'language': transcript_result['language'],
+                                'device': self.transcriber.last_device or 'cpu'
+                            }
+                            result['transcript'] = transcript_result['text']
+                            self._save_checkpoint(result)
+                            self.logger.info("✅ CPU fallback transcription succeeded!")
+                            break
+                            
+                        except Exception as cpu_error:
+                            last_error = cpu_error
+                            self.logger.warning(f"⚠️ CPU fallback also failed: {cpu_error}")
+                            self.transcriber.unload_model()
+                    else:
+                        self.logger.info("ℹ️ Auto-detect already selected CPU; skipping redundant CPU fallback")
+                    
+                    # Wait before retrying unless this was the last attempt
+                    if attempt < max_retries - 1:
+                        self.logger.info(f"⏳ Retrying in {retry_delay} seconds...")
+                        time.sleep(retry_delay)
+                        retry_delay *= 2  # Exponential backoff
             
-            # ========== Step 4: Generate summary ==========
-            if not skip_summary and 'transcript' in result:
-                self.logger.info("\n📍 Step 3: Generate summary (LLM)")
-                self.logger.info("-" * 30)
+            else:
+                # All retry attempts failed
+                self.logger.error(f"❌ Transcription still failed after {max_retries} retries: {last_error}")
+                result['steps']['transcribe'] = {
+                    'status': 'error',
+                    'error': str(last_error)
+                }
+                raise last_error
+        else:
+            self.logger.info("⏭️ Skipping transcription step")
+        
+        # ========== Step 3: Clean up audio files ==========
+        if Config.CLEANUP_AUDIO and audio_path:
+            self.downloader.cleanup(audio_path)
+    
+    def _summarize_step(self, result: dict, skip_summary: bool):
+        """Step 4: clean the transcript and generate the summary."""
+        if not skip_summary and 'transcript' in result:
+            self.logger.info("\n📍 Step 3: Generate summary (LLM)")
+            self.logger.info("-" * 30)
 
-                transcript_for_summary = result['transcript']
-                if self.transcript_cleaner.enabled:
-                    self.logger.info("🧹 Cleaning transcript before summarization")
-                    cleaned_transcript = self.transcript_cleaner.clean(transcript_for_summary)
-                    result['steps']['clean_transcript'] = {
-                        'status': 'success',
-                        'enabled': True,
-                        'original_length': len(transcript_for_summary),
-                        'cleaned_length': len(cleaned_transcript),
-                    }
-                    transcript_for_summary = cleaned_transcript
-                else:
-                    result['steps']['clean_transcript'] = {
-                        'status': 'skipped',
-                        'reason': 'disabled'
-                    }
-                
-                # Check whether Ollama is available
-                if not self.summarizer.check_ollama():
-                    raise Exception("Ollama is not running")
-                
-                # Check the model; still try running even if lookup fails
-                if not self.summarizer.check_model_loaded():
-                    self.logger.warning("Model check did not pass. Trying a direct call anyway...")
-                
-                # Generate the summary
-                content_type = result.get('content_type', 'video')
-                summary_result = self.summarizer.summarize(
-                    transcript_for_summary,
-                    max_length=Config.MAX_TRANSCRIPT_LENGTH,
-                    content_type=content_type
-                )
-                
-                # Release VRAM
-                self.summarizer.unload_model()
-                
-                result['steps']['summarize'] = {
+            transcript_for_summary = result['transcript']
+            if self.transcript_cleaner.enabled:
+                self.logger.info("🧹 Cleaning transcript before summarization")
+                cleaned_transcript = self.transcript_cleaner.clean(transcript_for_summary)
+                result['steps']['clean_transcript'] = {
                     'status': 'success',
-                    'model': self.summarizer.model
+                    'enabled': True,
+                    'original_length': len(transcript_for_summary),
+                    'cleaned_length': len(cleaned_transcript),
                 }
-                result['summary'] = summary_result['summary']
-                result['key_points'] = summary_result['key_points']
-                result['tags'] = summary_result['tags']
-                result['category'] = summary_result.get('category', '未分类')
-                result['sentiment'] = summary_result.get('sentiment', 'neutral')
-                result['language'] = summary_result.get('language', 'zh')
-                self._save_checkpoint(result)
+                transcript_for_summary = cleaned_transcript
             else:
-                self.logger.info("⏭️ Skipping summary step")
-            
-            # ========== Step 5: Write to Notion ==========
-            if self.notion_writer:
-                self.logger.info("\n📍 Step 4: Write to Notion")
-                self.logger.info("-" * 30)
-                
-                # Check for duplicates
-                if self.notion_writer.check_duplicate(url):
-                    self.logger.warning("⚠️ URL already exists. Skipping write.")
-                    result['steps']['notion'] = {'status': 'skipped', 'reason': 'duplicate'}
-                else:
-                    # Prepare the payload
-                    notion_data = {
-                        'title': result.get('title', url[:50]),
-                        'url': url,
-                        'platform': result.get('platform', 'Unknown'),
-                        'transcript': result.get('transcript', ''),
-                        'summary': result.get('summary', ''),
-                        'tags': result.get('tags', []),
-                        'key_points': result.get('key_points', []),
-                        'category': result.get('category', '未分类'),
-                        'sentiment': result.get('sentiment', 'neutral'),
-                    }
-                    
-                    page = self.notion_writer.create_page(notion_data)
-                    result['steps']['notion'] = {
-                        'status': 'success',
-                        'page_id': page.get('id', 'unknown')
-                    }
-                    self._save_checkpoint(result)
-            else:
-                self.logger.info("⏭️ Skipping Notion write")
+                result['steps']['clean_transcript'] = {
+                    'status': 'skipped',
+                    'reason': 'disabled'
+                }
             
-            # ========== Complete ==========
-            result['status'] = 'success'
-            result['end_time'] = datetime.now().isoformat()
+            # Check whether Ollama is available
+            if not self.summarizer.check_ollama():
+                raise Exception("Ollama is not running")
             
-            elapsed = datetime.fromisoformat(result['end_time']) - datetime.fromisoformat(result['start_time'])
-            result['elapsed_seconds'] = elapsed.total_seconds()
+            # Check the model; still try running even if lookup fails
+            if not self.summarizer.check_model_loaded():
+                self.logger.warning("Model check did not pass. Trying a direct call anyway...")
             
-            self.logger.info("\n" + "=" * 50)
-            self.logger.info("✅ Processing complete!")
-            self.logger.info(f"⏱️ Total elapsed time: {elapsed.total_seconds():.1f} seconds")
-            self.logger.info("=" * 50)
+            # Generate the summary
+            content_type = result.get('content_type', 'video')
+            summary_result = self.summarizer.summarize(
+                transcript_for_summary,
+                max_length=Config.MAX_TRANSCRIPT_LENGTH,
+                content_type=content_type
+            )
             
-            # Remove the checkpoint after a successful run
-            try:
-                checkpoint_path = self._get_checkpoint_path(url)
-                if checkpoint_path.exists():
-                    checkpoint_path.unlink()
-                    self.logger.info("🗑️ Checkpoint file removed")
-            except:
-                pass
+            # Release VRAM unless a batch keeps the model resident
+            if not self._keep_models_loaded:
+                self.summarizer.unload_model()
             
-            return result
+            result['steps']['summarize'] = {
+                'status': 'success',
+                'model': self.summarizer.model
+            }
+            result['summary'] = summary_result['summary']
+            result['key_points'] = summary_result['key_points']
+            result['tags'] = summary_result['tags']
+            result['category'] = summary_result.get('category', '未分类')
+            result['sentiment'] = summary_result.get('sentiment', 'neutral')
+            result['language'] = summary_result.get('language', 'zh')
+        else:
+            self.logger.info("⏭️ Skipping summary step")
+    
+    def _notion_step(self, result: dict):
+        """Step 5: write the result to Notion."""
+        if self.notion_writer:
+            self.logger.info("\n📍 Step 4: Write to Notion")
+            self.logger.info("-" * 30)
             
-        except Exception as e:
-            result['status'] = 'error'
-            result['error'] = str(e)
-            result['end_time'] = datetime.now().isoformat()
-            # Save a checkpoint for failed runs
-            self._save_checkpoint(result)
-            self.logger.error(f"❌ Processing failed: {e}")
-            self.logger.info("💡 Re-running will continue from the saved checkpoint")
-            raise
-
+            url = result['url']
+            # Check for duplicates
+            if self.notion_writer.check_duplicate(url):
+                self.logger.warning("⚠️ URL already exists. Skipping write.")
+                result['steps']['notion'] = {'status': 'skipped', 'reason': 'duplicate'}
+            else:
+                # Prepare the payload
+                notion_data = {
+                    'title': result.get('title', url[:50]),
+                    'url': url,
+                    'platform': result.get('platform', 'Unknown'),
+                    'transcript': result.get('transcript', ''),
+                    'summary': result.get('summary', ''),
+                    'tags': result.get('tags', []),
+                    'key_points': result.get('key_points', []),
+                    'category': result.get('category', '未分类'),
+                    'sentiment': result.get('sentiment', 'neutral'),
+                }
+                
+                page = self.notion_writer.create_page(notion_data)
+                result['steps']['notion'] = {
+                    'status': 'success',
+                    'page_id': page.get('id', 'unknown')
+                }
+        else:
+            self.logger.info("⏭️ Skipping Notion write")
+    
+    def _complete(self, result: dict) -> dict:
+        """Mark the result as successful and remove its checkpoint."""
+        result['status'] = 'success'
+        result['end_time'] = datetime.now().isoformat()
+        
+        elapsed = datetime.fromisoformat(result['end_time']) - datetime.fromisoformat(result['start_time'])
+        result['elapsed_seconds'] = elapsed.total_seconds()
+        
+        self.logger.info("\n" + "=" * 50)
+        self.logger.info("✅ Processing complete!")
+        self.logger.info(f"⏱️ Total elapsed time: {elapsed.total_seconds():.1f} seconds")
+        self.logger.info("=" * 50)
+        
+        # Remove the checkpoint after a successful run
+        try:
+            checkpoint_path = self._get_checkpoint_path(result['url'])
+            if checkpoint_path.exists():
+                checkpoint_path.unlink()
+                self.logger.info("🗑️ Checkpoint file removed")
+        except:
+            pass
+        
+        return result
+    
+    def _record_failure(self, result: dict, error: Exception):
+        """Mark the result as failed and save a checkpoint for resuming."""
+        result['status'] = 'error'
+        result['error'] = str(error)
+        result['end_time'] = datetime.now().isoformat()
+        # Save a checkpoint for failed runs
+        self._save_checkpoint(result)
+        self.logger.error(f"❌ Processing failed: {error}")
+        self.logger.info("💡 Re-running will continue from the saved checkpoint")
 
 def main():
     """CLI entry point."""
@@ -484,10 +683,14 @@ Examples:
   python main.py "https://www.youtube.com/watch?v=xxx"
   python main.py "https://bilibili.com/video/xxx" --log-level DEBUG
   python main.py "url" --skip-summary
+  python main.py "url1" "url2" "url3"
+  python main.py -a urls.txt
         """
     )
     
-    parser.add_argument('url', nargs='?', help='Video URL')
+    parser.add_argument('urls', nargs='*', metavar='url', help='Video URL(s)')
+    parser.add_argument('-a', '--batch-file',
+                       help='File containing URLs to process, one per line (# starts a comment)')
     parser.add_argument('--log-level', default='INFO', 
                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
                        help='Log level')
@@ -503,10 +706,20 @@ Examples:
                        help='Do not delete temporary audio files')
     parser.add_argument('--no-resume', action='store_true',
                        help='Start fresh instead of resuming from a checkpoint')
+    parser.add_argument('--whisper-quality', choices=['fast', 'accurate'],
+                       help='Whisper decoding: fast (greedy) or accurate (beam search, ~4x slower decoder)')
     
     args = parser.parse_args()
     
-    if not args.url:
+    urls = list(args.urls)
+    if args.batch_file:
+        with open(args.batch_file, 'r', encoding='utf-8') as f:
+            urls.extend(
+                line.strip() for line in f
+                if line.strip() and not line.lstrip().startswith('#')
+            )
+    
+    if not urls:
         parser.print_help()
         print("\nPlease provide a video URL")
         sys.exit(1)
@@ -517,6 +730,7 @@ Examples:
     # Update runtime configuration
     Config.CLEANUP_AUDIO = not args.no_cleanup
     Config.DISABLE_NOTION = Config.DISABLE_NOTION or args.skip_notion
+    Config.WHISPER_QUALITY = args.whisper_quality or Config.WHISPER_QUALITY
     
     # Create the pipeline
     pipeline = VideoPipeline(
@@ -525,10 +739,28 @@ Examples:
         disable_cleaning=args.disable_cleaning,
     )
     
+    # Multiple URLs: overlap downloads with the GPU stages
+    if len(urls) > 1:
+        results = pipeline.run_many(
+            urls,
+            skip_transcribe=args.skip_transcribe,
+            skip_summary=args.skip_summary,
+            resume=not args.no_resume
+        )
+        
+        print("\n📊 Processing results:")
+        print(dumps_json(results).decode('utf-8'))
+        
+        failed = [r['url'] for r in results if r.get('status') != 'success']
+        if failed:
+            logger.error(f"Workflow failed for {len(failed)}/{len(results)} URLs: {failed}")
+            sys.exit(1)
+        return
+    
     # Run the workflow
     try:
         result = pipeline.run(
-            url=args.url,
+            url=urls[0],
             skip_transcribe=args.skip_transcribe,
             skip_summary=args.skip_summary,
             resume=not args.no_resume
@@ -536,7 +768,7 @@ Examples:
         
         # Print the JSON result
         print("\n📊 Processing result:")
-        print(json.dumps(result, indent=2, ensure_ascii=False))
+        print(dumps_json(result).decode('utf-8'))
         
     except Exception as e:
         logger.error(f"Workflow execution failed: {e}")
@@ -7,23 +7,262 @@
 """
 
 import os
+import sys
+import copy
 import json
+import sqlite3
+import hashlib
+import atexit
+import importlib.util
+import time
+import random
+import functools
+import itertools
+import operator
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, Iterable, List, Any, Set, Tuple, Union
 
 from dotenv import load_dotenv
 
-# Load .env
-load_dotenv()
 
-# Notion client
+@functools.cache
+def _bootstrap() -> Optional[type]:
+    """
+    Load .env and import notion_client once, on first use rather than at import.
+
+    Returns:
+        notion_client.Client, or None when notion_client is not installed
+    """
+    load_dotenv()
+    try:
+        from notion_client import Client
+    except ImportError:
+        print("⚠️ notion_client is not installed. MockNotionWriter will be used for local JSON output only.")
+        return None
+    return Client
+
+
+# Optional speedup: orjson for request bodies
 try:
-    from notion_client import Client
-    USE_NOTION_CLIENT = True
+    import orjson
 except ImportError:
-    USE_NOTION_CLIENT = False
-    print("⚠️ notion_client is not installed. MockNotionWriter will be used for local JSON output only.")
+    orjson = None
+
+NOTION_API_URL = "https://api.notion.com/v1/"
+NOTION_VERSION = "2022-06-28"
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize a request body once, with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def _dumps_line(obj: Any) -> bytes:
+    """Serialize one JSON Lines record (newline included)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _loads(data: Any) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+@lru_cache(maxsize=8)
+def _load_env_file(env_file: str) -> None:
+    """Load an extra .env file into os.environ once; variables already set win."""
+    load_dotenv(env_file, override=False)
+
+
+# -------------------- Property builders --------------------
+PropertyEntry = Optional[Tuple[str, Dict[str, Any]]]
+
+
+def _clip(value: Any, n: int) -> str:
+    """Clip to at most n characters without copying str inputs that already fit."""
+    s = value if type(value) is str else str(value)
+    return s if len(s) <= n else s[:n]
+
+
+def _rich_text(content: Any, limit: Optional[int] = 2000) -> Dict[str, Any]:
+    """rich_text property value (Notion caps text content at 2000 characters)."""
+    return {"rich_text": [{"text": {"content": content if limit is None else _clip(content, limit)}}]}
+
+
+def _select(name: Any, limit: int = 50) -> Dict[str, Any]:
+    """select property value."""
+    return {"select": {"name": _clip(name, limit)}}
+
+
+def _date(start: Optional[str] = None) -> Dict[str, Any]:
+    """date property value; defaults to now."""
+    return {"date": {"start": start or datetime.now().isoformat()}}
+
+
+def _prop_platform(value: Any) -> PropertyEntry:
+    platform = str(value).strip()
+    if platform:
+        return "Platform", _select(platform)
+    return None
+
+
+def _prop_summary(value: Any) -> PropertyEntry:
+    # rich_text, <= 2000 characters
+    summary = str(value).strip()
+    if summary:
+        return "Summary", _rich_text(summary)
+    return None
+
+
+def _prop_tags(value: Any) -> PropertyEntry:
+    # multi_select
+    if isinstance(value, str):
+        tag_list = [t.strip() for t in value.split(",") if t.strip()][:10]
+    elif isinstance(value, list):
+        tag_list = [str(t).strip() for t in value if str(t).strip()][:10]
+    else:
+        tag_list = []
+    if tag_list:
+        return "Tags", {"multi_select": [{"name": _clip(t, 50)} for t in tag_list]}
+    return None
+
+
+def _prop_key_points(value: Any) -> PropertyEntry:
+    # rich_text
+    if isinstance(value, list):
+        key_points_text = "\n".join(f"- {str(p)}" for p in value[:10])
+    else:
+        key_points_text = str(value)
+    return "KeyPoints", _rich_text(key_points_text)
+
+
+def _prop_category(value: Any) -> PropertyEntry:
+    category = str(value).strip()
+    if category:
+        return "Category", _select(category)
+    return None
+
+
+def _prop_sentiment(value: Any) -> PropertyEntry:
+    sentiment = str(value).strip()
+    if sentiment:
+        return "Sentiment", _select(sentiment, 20)
+    return None
+
+
+# -------------------- Rate limiting / retries --------------------
+class TokenBucket:
+    """
+    Thread-safe token bucket: `capacity` burst, refilled at `refill_rate` tokens/sec.
+    Shared by the sync and async request paths of one integration token.
+    """
+
+    def __init__(self, capacity: int = 3, refill_rate: float = 3.0):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token and return how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_rate)
+            self._updated = now
+            self._tokens -= 1  # May go negative: later callers queue behind this one
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.refill_rate
+
+    def acquire(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+MAX_RETRIES = 5  # Extra attempts for a request that hit 429 / 5xx
+
+
+class NotionHTTPError(Exception):
+    """Error response from the direct httpx batch path (mirrors APIResponseError.status)."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+# Reads: safe to resend after a timeout or 5xx. A create/append that timed out
+# or got a 502/504 may still have been applied, so resending it could duplicate
+# the page or its blocks; only a 429 (rejected before processing) is retried.
+IDEMPOTENT_ENDPOINTS = frozenset({
+    "databases.retrieve", "databases.query", "pages.retrieve", "blocks.children.list", "users.me",
+})
+
+
+def _is_retryable(exc: Exception, idempotent: bool = True) -> bool:
+    """Rate limits (429) are worth retrying; server errors (5xx) and timeouts only for idempotent calls."""
+    status = getattr(exc, "status", None)
+    if isinstance(status, int):
+        return status == 429 or (idempotent and status >= 500)
+    if not idempotent:
+        return False
+    httpx = sys.modules.get("httpx")  # Loaded by notion_client / the batch path
+    if httpx is not None and isinstance(exc, httpx.TimeoutException):
+        return True
+    return type(exc).__name__ == "RequestTimeoutError"
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter, capped at 60 seconds."""
+    return min(60, 0.5 * 2 ** attempt) + random.uniform(0, 0.25)
+
+
+def _with_retry(idempotent):
+    """
+    Retry a single Notion request (sync or async) on retryable errors.
+    `idempotent` is called with the request's arguments and decides whether a 5xx/timeout may be resent.
+    """
+    def decorate(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                for attempt in range(MAX_RETRIES + 1):
+                    try:
+                        return await func(*args, **kwargs)
+                    except Exception as e:
+                        if attempt == MAX_RETRIES or not _is_retryable(e, idempotent(*args, **kwargs)):
+                            raise
+                        delay = _backoff_delay(attempt)
+                        print(f"⏳ Notion request failed ({e}); retrying in {delay:.1f}s")
+                        await asyncio.sleep(delay)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(MAX_RETRIES + 1):
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    if attempt == MAX_RETRIES or not _is_retryable(e, idempotent(*args, **kwargs)):
+                        raise
+                    delay = _backoff_delay(attempt)
+                    print(f"⏳ Notion request failed ({e}); retrying in {delay:.1f}s")
+                    time.sleep(delay)
+        return wrapper
+    return decorate
 
 
 class NotionWriter:
@@ -36,44 +275,229 @@ class NotionWriter:
     KEEP_TRANSCRIPT_PREVIEW = False          # Optional: keep TranscriptPreview (first N characters)
     TRANSCRIPT_PREVIEW_CHARS = 500           # TranscriptPreview length
     USE_TOGGLE_FOR_TRANSCRIPT = True         # ✅ Put transcript content inside a collapsed toggle
+    MAX_CONCURRENT_REQUESTS = 3              # In-flight requests for batch writes (Notion allows ~3 req/s)
+    PARALLEL_BLOCK_APPENDS = False           # Send a page's block appends concurrently (Notion may store them out of order)
+    APPEND_CONCURRENCY = 8                   # In-flight block appends per page when PARALLEL_BLOCK_APPENDS is on
+    DUPLICATE_CACHE_TTL = 300                # Seconds a duplicate-check result stays valid
+    DUPLICATE_CACHE_SIZE = 1024              # Max URLs kept in the duplicate-check cache
+    PROPERTIES_CACHE_SIZE = 512              # Built property dicts reused on retries / re-submits
+    RATE_LIMIT_BURST = 3                     # Token bucket capacity per integration token
+    RATE_LIMIT_PER_SEC = 3.0                 # Token bucket refill rate (Notion's average limit)
+    DEDUP_DB_PATH = Path(__file__).parent / ".notion_writer.sqlite3"  # Persistent URL cache (None: memory only)
+    URL_CACHE_MAX_AGE = 3600                 # Seconds a cached URL (or a full refresh_cache() scan, for misses) is trusted
+    REQUEST_TIMEOUT = 30.0                   # Seconds before a single Notion request is abandoned (reads are retried)
+    WARM_UP_CONNECTION = False               # Open the TLS connection(s) in the background at construction
     # ================================================
 
     def __init__(
         self,
-        token: Optional[str] = None,
+        token: Union[str, List[str], None] = None,
         database_id: Optional[str] = None,
         env_file: str = ".env"
     ):
-        self.token = token or os.getenv("NOTION_TOKEN") or self._load_env(env_file, "NOTION_TOKEN")
-        self.database_id = database_id or os.getenv("NOTION_DATABASE_ID") or self._load_env(env_file, "NOTION_DATABASE_ID")
+        """
+        Args:
+            token: Integration token, or a list of tokens (a comma-separated
+                NOTION_TOKEN works too). Requests are spread round-robin over the
+                tokens, each with its own rate limit, so K tokens give ~3K req/s.
+                Every integration must be connected to the same database.
+            database_id: Target database ID
+            env_file: Extra .env file loaded (without overriding set variables) before
+                NOTION_TOKEN / NOTION_DATABASE_ID are read
+        """
+        Client = _bootstrap()  # Loads .env before the environment is read
+        if env_file:
+            _load_env_file(env_file)
+        token = token or os.getenv("NOTION_TOKEN")
+        if isinstance(token, str):
+            token = token.split(",")
+        self.tokens = [t.strip() for t in token or [] if t and t.strip()]
+        self.token = self.tokens[0] if self.tokens else None
+        self.database_id = database_id or os.getenv("NOTION_DATABASE_ID")
 
         if not self.token:
             raise ValueError("NOTION_TOKEN is not set")
         if not self.database_id:
             raise ValueError("NOTION_DATABASE_ID is not set")
-        if not USE_NOTION_CLIENT:
+        if Client is None:
             raise ValueError("notion_client is not installed (pip install notion-client)")
 
-        self.client = Client(auth=self.token)
+        # One client + rate limiter per token, picked round-robin by _next_slot()
+        self.clients = [Client(auth=t, timeout_ms=int(self.REQUEST_TIMEOUT * 1000)) for t in self.tokens]
+        self.buckets = [TokenBucket(self.RATE_LIMIT_BURST, self.RATE_LIMIT_PER_SEC) for _ in self.tokens]
+        self.client = self.clients[0]
+        self._rr = itertools.cycle(range(len(self.tokens)))
+        self._rr_lock = threading.Lock()
+
+        # url -> (checked_at, exists); skips repeated duplicate queries for the same URL
+        self._dup_cache: Dict[str, Tuple[float, bool]] = {}
+        # content hash -> built properties (LRU); skips rebuilding on retries
+        self._props_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        # Persistent URL cache: URL -> when it was last seen in Notion, loaded once
+        # from SQLite and kept in sync by create_page / check_duplicate / refresh_cache()
+        self._db_lock = threading.Lock()
+        self._db = self._open_dedup_db()
+        self._url_cache, self._cache_refreshed_at = self._load_url_cache()
+
+        if self.WARM_UP_CONNECTION:
+            threading.Thread(target=self._warm_up, name="notion-warm-up", daemon=True).start()
+
+    def _warm_up(self) -> None:
+        """Fire-and-forget users.me per client so DNS + TLS are done before the first real request."""
+        for client, bucket in zip(self.clients, self.buckets):
+            try:
+                bucket.acquire()
+                client.users.me()
+            except Exception:
+                pass  # Best effort: real requests report their own errors
 
-    def _load_env(self, env_file: str, key: str) -> Optional[str]:
-        env_path = Path(env_file)
-        if not env_path.exists():
+    def _open_dedup_db(self) -> Optional[sqlite3.Connection]:
+        """Open the local written-URL store; failures just disable it."""
+        if not self.DEDUP_DB_PATH:
             return None
-        with open(env_path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                if "=" in line:
-                    k, v = line.split("=", 1)
-                    if k.strip() == key:
-                        return v.strip()
-        return None
+        try:
+            db = sqlite3.connect(str(self.DEDUP_DB_PATH), isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS written ("
+                "database_id TEXT NOT NULL, url TEXT NOT NULL, page_id TEXT, ts REAL, "
+                "PRIMARY KEY (database_id, url)) WITHOUT ROWID"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS refreshed ("
+                "database_id TEXT PRIMARY KEY, ts REAL) WITHOUT ROWID"
+            )
+            return db
+        except sqlite3.Error as e:
+            print(f"⚠️ Local dedup cache unavailable ({e}); using Notion queries only")
+            return None
+
+    def _load_url_cache(self) -> Tuple[Dict[str, float], float]:
+        """Load this database's known URLs (with when they were seen) and last full-scan time."""
+        if self._db is None:
+            return {}, 0.0
+        with self._db_lock:
+            urls = dict(self._db.execute(
+                "SELECT url, ts FROM written WHERE database_id = ?", (self.database_id,)
+            ))
+            row = self._db.execute(
+                "SELECT ts FROM refreshed WHERE database_id = ?", (self.database_id,)
+            ).fetchone()
+        return urls, (row[0] if row else 0.0)
+
+    def _cache_is_warm(self) -> bool:
+        """Whether a recent full scan lets a cache miss count as "not in Notion"."""
+        return time.time() - self._cache_refreshed_at < self.URL_CACHE_MAX_AGE
+
+    def _record_written(self, url: Optional[str], page_id: Optional[str]) -> None:
+        """Add a URL known to exist to the cache and persist it for later runs."""
+        url = str(url or "").strip()
+        if not url:
+            return
+        now = time.time()
+        self._url_cache[url] = now
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO written VALUES (?, ?, ?, ?)",
+                (self.database_id, url, page_id, now),
+            )
+
+    def _forget_written(self, url: str) -> None:
+        """Drop a URL that is no longer in Notion (e.g. its page was deleted)."""
+        if self._url_cache.pop(url, None) is None or self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute(
+                "DELETE FROM written WHERE database_id = ? AND url = ?", (self.database_id, url)
+            )
+
+    # -------------------- Requests: rate-limited, retried --------------------
+    def _next_slot(self) -> int:
+        """Index of the token to use for the next request (round-robin)."""
+        with self._rr_lock:
+            return next(self._rr)
+
+    @_with_retry(lambda self, endpoint, **kwargs: endpoint in IDEMPOTENT_ENDPOINTS)
+    def _request(self, endpoint: str, **kwargs) -> Dict[str, Any]:
+        """
+        Call a notion_client endpoint (e.g. "pages.create") on the next pooled
+        client, after waiting on that token's bucket.
+        """
+        i = self._next_slot()
+        self.buckets[i].acquire()
+        return operator.attrgetter(endpoint)(self.clients[i])(**kwargs)
+
+    def _http_client(self, token: str) -> "httpx.AsyncClient":
+        """Pooled (HTTP/2 when h2 is installed) connection for direct batch requests."""
+        import httpx  # Ships with notion_client
+        return httpx.AsyncClient(
+            base_url=NOTION_API_URL,
+            http2=importlib.util.find_spec("h2") is not None,  # httpx needs h2 for HTTP/2
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Notion-Version": NOTION_VERSION,
+                "Content-Type": "application/json",
+            },
+            timeout=self.REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=8),
+        )
+
+    @_with_retry(lambda self, http, method, path, body=None: method == "GET")
+    async def _asend(self, http: List["httpx.AsyncClient"], method: str, path: str,
+                     body: Optional[bytes] = None) -> Dict[str, Any]:
+        """
+        Send a pre-serialized body on the next pooled connection (behind its token bucket).
+        `http` lines up with self.tokens; the body is encoded once and reused on retries.
+        """
+        i = self._next_slot()
+        await self.buckets[i].acquire_async()
+        resp = await http[i].request(method, path, content=body)
+        if resp.status_code >= 400:
+            try:
+                message = resp.json().get("message") or resp.text
+            except ValueError:
+                message = resp.text
+            raise NotionHTTPError(resp.status_code, message)
+        return resp.json()
+
+    async def _post_page(self, http: List["httpx.AsyncClient"], properties: Dict[str, Any],
+                         children: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """POST /v1/pages directly, skipping notion_client's per-call request building."""
+        payload: Dict[str, Any] = {"parent": {"database_id": self.database_id}, "properties": properties}
+        if children:
+            payload["children"] = children
+        return await self._asend(http, "POST", "pages", _dumps(payload))
+
+    # -------------------- Schema: column types --------------------
+    @functools.cached_property
+    def _schema(self) -> Dict[str, str]:
+        """Column name -> property type, fetched once per writer."""
+        return self._remember_schema(self._request("databases.retrieve", database_id=self.database_id))
+
+    def _remember_schema(self, db: Dict[str, Any]) -> Dict[str, str]:
+        """Cache the column types from a databases.retrieve response already in hand."""
+        schema = {name: prop.get("type") for name, prop in (db.get("properties") or {}).items()}
+        self.__dict__["_schema"] = schema
+        return schema
+
+    def _url_type(self) -> str:
+        """
+        Type of the URL column ("rich_text" or "url"); assumes rich_text if unreadable.
+        A failed schema fetch is not repeated: the empty schema is cached until
+        test_connection() or refresh_cache() reads the real one.
+        """
+        try:
+            return self._schema.get("URL") or "rich_text"
+        except Exception:
+            self.__dict__["_schema"] = {}
+            return "rich_text"
 
     def test_connection(self) -> bool:
         try:
-            self.client.databases.retrieve(database_id=self.database_id)
+            self._remember_schema(self._request("databases.retrieve", database_id=self.database_id))
             print("✅ Notion connection successful")
             return True
         except Exception as e:
@@ -87,26 +511,112 @@ class NotionWriter:
         children = self._build_children(data)
 
         try:
-            # Create the page first with an initial block batch to avoid oversized requests
-            initial_children = children[:100] if children else None
-            if initial_children:
-                page = self.client.pages.create(
-                    parent={"database_id": self.database_id},
-                    properties=properties,
-                    children=initial_children,
-                )
-            else:
-                page = self.client.pages.create(
-                    parent={"database_id": self.database_id},
-                    properties=properties,
-                )
+            # Create the page with the first block batch, then append whatever is left
+            initial, remaining, nested = self._split_children(children)
+            kwargs: Dict[str, Any] = {"children": initial} if initial else {}
+            page = self._request(
+                "pages.create",
+                parent={"database_id": self.database_id},
+                properties=properties,
+                **kwargs,
+            )
+
+            page_id = page.get("id")
+            print(f"✅ Created Notion page: {page_id or 'unknown'}")
+            self._remember_duplicate(data.get("url"), True)
+            self._record_written(data.get("url"), page_id)
+
+            if page_id:
+                self._append_blocks(page_id, remaining)
+                if nested:
+                    listing = self._request("blocks.children.list", block_id=page_id, page_size=100)
+                    block_ids = [b["id"] for b in listing.get("results", [])]
+                    for pos, blocks in nested:
+                        self._append_blocks(block_ids[pos], blocks)
+
+            return page
+
+        except Exception as e:
+            raise Exception(f"Failed to create Notion page: {str(e)}")
+
+    # -------------------- Batch: create pages concurrently --------------------
+    def create_pages(self, items: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Create several pages concurrently (sync wrapper around acreate_pages).
+
+        Returns:
+            One page dict per item, or the Exception raised for that item, in input order
+        """
+        return asyncio.run(self.acreate_pages(items))
+
+    async def acreate_pages(self, items: List[Dict[str, Any]]) -> List[Any]:
+        """Create several pages concurrently, keeping at most MAX_CONCURRENT_REQUESTS in flight."""
+        sem = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS * len(self.tokens))
+        created_time = datetime.now().isoformat()  # One timestamp for the whole batch
+        async with AsyncExitStack() as stack:
+            http = [await stack.enter_async_context(self._http_client(t)) for t in self.tokens]
+            return await asyncio.gather(
+                *(self._acreate_page(http, sem, data, created_time) for data in items),
+                return_exceptions=True,
+            )
+
+    async def create_page_async(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async create_page: with PARALLEL_BLOCK_APPENDS the block appends of a long
+        page overlap (up to APPEND_CONCURRENCY in flight) instead of one RTT each.
+        Sync callers can use create_pages([data]).
+        """
+        sem = asyncio.Semaphore(self.APPEND_CONCURRENCY)
+        async with AsyncExitStack() as stack:
+            http = [await stack.enter_async_context(self._http_client(t)) for t in self.tokens]
+            return await self._acreate_page(http, sem, data)
+
+    async def _acreate_page(
+        self,
+        http: List["httpx.AsyncClient"],
+        sem: asyncio.Semaphore,
+        data: Dict[str, Any],
+        created_time: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Async counterpart of create_page; every request waits for a semaphore slot."""
+        properties = self._build_properties(data, created_time)
+        children = self._build_children(data)
+
+        try:
+            initial, remaining, nested = self._split_children(children)
+            async with sem:
+                page = await self._post_page(http, properties, initial)
 
             page_id = page.get("id")
             print(f"✅ Created Notion page: {page_id or 'unknown'}")
+            self._remember_duplicate(data.get("url"), True)
+            self._record_written(data.get("url"), page_id)
 
-            # Append remaining blocks if there are more than 100
-            if children and len(children) > 100 and page_id:
-                self._append_blocks(page_id, children[100:])
+            # Remaining blocks are appended after the page exists
+            async def append(block_id: str, blocks: List[Dict[str, Any]]) -> None:
+                batches = [blocks[i:i + 100] for i in range(0, len(blocks), 100)]
+
+                async def send(batch: List[Dict[str, Any]]) -> None:
+                    async with sem:
+                        await self._asend(
+                            http, "PATCH", f"blocks/{block_id}/children",
+                            _dumps({"children": batch}),
+                        )
+
+                if self.PARALLEL_BLOCK_APPENDS:
+                    await asyncio.gather(*(send(batch) for batch in batches))
+                else:
+                    for batch in batches:  # One at a time keeps the blocks in order
+                        await send(batch)
+
+            if page_id:
+                await append(page_id, remaining)
+                if nested:
+                    async with sem:
+                        listing = await self._asend(http, "GET", f"blocks/{page_id}/children?page_size=100")
+                    block_ids = [b["id"] for b in listing.get("results", [])]
+                    for pos, blocks in nested:
+                        await append(block_ids[pos], blocks)
 
             return page
 
@@ -114,7 +624,55 @@ class NotionWriter:
             raise Exception(f"Failed to create Notion page: {str(e)}")
 
     # -------------------- Properties: database columns --------------------
-    def _build_properties(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    # (source key, builder) pairs for columns that depend on a single input field;
+    # each builder returns (column name, property value) or None to skip the column
+    _PROPERTY_HANDLERS = (
+        ("platform", _prop_platform),
+        ("summary", _prop_summary),
+        ("tags", _prop_tags),
+        ("key_points", _prop_key_points),
+        ("category", _prop_category),
+        ("sentiment", _prop_sentiment),
+    )
+
+    def _build_properties(self, data: Dict[str, Any], created_time: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build Notion page properties, reusing an earlier result for the same fields.
+
+        Only CreatedTime is refreshed on a cache hit; everything else depends on
+        the fields in _property_key. See _build_properties_uncached for the layout.
+        """
+        key = self._property_key(data)
+
+        cached = self._props_cache.get(key)
+        if cached is not None:
+            self._props_cache.move_to_end(key)
+            properties = copy.deepcopy(cached)
+            properties["CreatedTime"] = _date(created_time)
+            return properties
+
+        properties = self._build_properties_uncached(data, created_time)
+        self._props_cache[key] = copy.deepcopy(properties)
+        if len(self._props_cache) > self.PROPERTIES_CACHE_SIZE:
+            self._props_cache.popitem(last=False)
+        return properties
+
+    _PROPERTY_FIELDS = ("title", "video_id", "id", "platform", "raw_title", "source_title", "url") + tuple(
+        key for key, _ in _PROPERTY_HANDLERS
+    )
+
+    def _property_key(self, data: Dict[str, Any]) -> bytes:
+        """Cache key over the fields properties are built from, plus the URL column type."""
+        fields = [data.get(k) for k in self._PROPERTY_FIELDS]
+        fields.append(self._url_type())
+        if self.KEEP_TRANSCRIPT_PROPERTY or self.KEEP_TRANSCRIPT_PREVIEW:
+            fields.append(data.get("transcript"))
+        return hashlib.blake2b(
+            json.dumps(fields, default=str, ensure_ascii=False).encode("utf-8"),
+            digest_size=16,
+        ).digest()
+
+    def _build_properties_uncached(self, data: Dict[str, Any], created_time: Optional[str] = None) -> Dict[str, Any]:
         """
         Build Notion page properties.
         - Name: title (the main page title)
@@ -122,6 +680,11 @@ class NotionWriter:
         - URL: rich_text (matches the current database schema)
         - Others: Platform/Tags/Category/Sentiment/Summary/KeyPoints/CreatedTime
         - Transcript is skipped by default to avoid truncation, but can be enabled
+
+        Args:
+            data: Page payload
+            created_time: ISO timestamp for CreatedTime; batch callers pass one
+                value for the whole batch (defaults to now)
         """
         properties: Dict[str, Any] = {}
 
@@ -130,7 +693,7 @@ class NotionWriter:
         if not title:
             fallback = data.get("video_id") or data.get("id") or "Untitled"
             title = str(fallback)
-        properties["Name"] = {"title": [{"text": {"content": title[:100]}}]}
+        properties["Name"] = {"title": [{"text": {"content": _clip(title, 100)}}]}
 
         # 2) Title (rich_text: raw title / source ID / fallback title)
         platform = str(data.get("platform") or "").strip()
@@ -140,66 +703,41 @@ class NotionWriter:
         elif not aux_title:
             aux_title = title
 
-        properties["Title"] = {"rich_text": [{"text": {"content": aux_title[:2000]}}]}
+        properties["Title"] = _rich_text(aux_title)
 
-        # 3) URL (the current database schema uses rich_text)
+        # 3) URL (rich_text in the current schema; a url-typed column takes the plain string)
         url = str(data.get("url") or "").strip()
         if url:
-            properties["URL"] = {"rich_text": [{"text": {"content": url}}]}
-
-        # 4) Platform (select)
-        if platform:
-            properties["Platform"] = {"select": {"name": platform[:50]}}
-
-        # 5) Summary (rich_text, <= 2000 characters)
-        summary = str(data.get("summary") or "").strip()
-        if summary:
-            properties["Summary"] = {"rich_text": [{"text": {"content": summary[:2000]}}]}
-
-        # 6) Tags (multi_select)
-        tags = data.get("tags")
-        if tags:
-            if isinstance(tags, str):
-                tag_list = [t.strip() for t in tags.split(",") if t.strip()][:10]
-            elif isinstance(tags, list):
-                tag_list = [str(t).strip() for t in tags if str(t).strip()][:10]
+            if self._url_type() == "url":
+                properties["URL"] = {"url": url}
             else:
-                tag_list = []
-            if tag_list:
-                properties["Tags"] = {"multi_select": [{"name": t[:50]} for t in tag_list]}
-
-        # 7) KeyPoints (rich_text)
-        key_points = data.get("key_points")
-        if key_points:
-            if isinstance(key_points, list):
-                key_points_text = "\n".join(f"- {str(p)}" for p in key_points[:10])
-            else:
-                key_points_text = str(key_points)
-            properties["KeyPoints"] = {"rich_text": [{"text": {"content": key_points_text[:2000]}}]}
-
-        # 8) Category / Sentiment (select)
-        category = str(data.get("category") or "").strip()
-        if category:
-            properties["Category"] = {"select": {"name": category[:50]}}
+                properties["URL"] = _rich_text(url, limit=None)
 
-        sentiment = str(data.get("sentiment") or "").strip()
-        if sentiment:
-            properties["Sentiment"] = {"select": {"name": sentiment[:20]}}
+        # 4) Single-field columns: Platform/Summary/Tags/KeyPoints/Category/Sentiment
+        for key, build in self._PROPERTY_HANDLERS:
+            value = data.get(key)
+            if not value:
+                continue
+            built = build(value)
+            if built:
+                properties[built[0]] = built[1]
 
-        # 9) CreatedTime (date)
-        properties["CreatedTime"] = {"date": {"start": datetime.now().isoformat()}}
+        # 5) CreatedTime (date)
+        properties["CreatedTime"] = _date(created_time)
 
-        # 10) Transcript property (not recommended, disabled by default)
+        # Transcripts can be tens of KB; only touch them when a property needs them
+        if not (self.KEEP_TRANSCRIPT_PROPERTY or self.KEEP_TRANSCRIPT_PREVIEW):
+            return properties
         transcript = str(data.get("transcript") or "").strip()
+
+        # 6) Transcript property (not recommended, disabled by default)
         if transcript and self.KEEP_TRANSCRIPT_PROPERTY:
             # Note: this content can still be truncated
-            properties["Transcript"] = {"rich_text": [{"text": {"content": transcript[:2000]}}]}
+            properties["Transcript"] = _rich_text(transcript)
 
-        # 11) TranscriptPreview (optional; requires a matching Text column in Notion)
+        # 7) TranscriptPreview (optional; requires a matching Text column in Notion)
         if transcript and self.KEEP_TRANSCRIPT_PREVIEW:
-            properties["TranscriptPreview"] = {
-                "rich_text": [{"text": {"content": transcript[: self.TRANSCRIPT_PREVIEW_CHARS]}}]
-            }
+            properties["TranscriptPreview"] = _rich_text(transcript, self.TRANSCRIPT_PREVIEW_CHARS)
 
         return properties
 
@@ -213,103 +751,183 @@ class NotionWriter:
             children.append(self._heading_2("Summary"))
             children.extend(self._paragraph_blocks(summary))
 
-        transcript = str(data.get("transcript") or "").strip()
-        if transcript and self.WRITE_TRANSCRIPT_TO_PAGE:
+        transcript_blocks: List[Dict[str, Any]] = []
+        if self.WRITE_TRANSCRIPT_TO_PAGE:
+            # Prefer per-segment texts, when the caller passes them, over the joined string
+            segments = data.get("transcript_segments")
+            if segments:
+                transcript_blocks = self._paragraph_blocks_from_iter(segments)
+            else:
+                transcript = str(data.get("transcript") or "").strip()
+                if transcript:
+                    transcript_blocks = self._paragraph_blocks(transcript)
+
+        if transcript_blocks:
             if self.USE_TOGGLE_FOR_TRANSCRIPT:
                 # Nest transcript blocks inside a toggle (collapsed by default)
-                toggle_children = self._paragraph_blocks(transcript)
-                children.append(self._toggle("Transcript", toggle_children))
+                children.append(self._toggle("Transcript", transcript_blocks))
             else:
                 children.append(self._heading_2("Transcript"))
-                children.extend(self._paragraph_blocks(transcript))
+                children.extend(transcript_blocks)
 
         return children
 
+    @staticmethod
+    def _split_children(
+        children: List[Dict[str, Any]],
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Tuple[int, List[Dict[str, Any]]]]]:
+        """
+        Split body blocks for the 100-blocks-per-request limit.
+
+        Returns:
+            (blocks sent with pages.create, top-level blocks to append afterwards,
+             [(position, blocks)] for nested children beyond the first 100 of a block)
+        """
+        initial: List[Dict[str, Any]] = []
+        nested: List[Tuple[int, List[Dict[str, Any]]]] = []
+        for pos, block in enumerate(children[:100]):
+            body = block.get(block.get("type"), {})
+            inner = body.get("children") if isinstance(body, dict) else None
+            if inner and len(inner) > 100:
+                block = dict(block, **{block["type"]: dict(body, children=inner[:100])})
+                nested.append((pos, inner[100:]))
+            initial.append(block)
+        return initial, children[100:], nested
+
     def _append_blocks(self, page_id: str, blocks: List[Dict[str, Any]]) -> None:
         """Append blocks in batches to avoid oversized requests."""
         if not blocks:
             return
         batch_size = 100
-        for i in range(0, len(blocks), batch_size):
-            self.client.blocks.children.append(
-                block_id=page_id,
-                children=blocks[i:i + batch_size]
-            )
+        batches = [blocks[i:i + batch_size] for i in range(0, len(blocks), batch_size)]
+
+        def append(batch: List[Dict[str, Any]]) -> None:
+            self._request("blocks.children.append", block_id=page_id, children=batch)
+
+        if self.PARALLEL_BLOCK_APPENDS and len(batches) > 1:
+            # Overlaps the round-trips; Notion stores batches in arrival order, so they may interleave
+            with ThreadPoolExecutor(max_workers=self.APPEND_CONCURRENCY) as pool:
+                list(pool.map(append, batches))
+        else:
+            for batch in batches:
+                append(batch)
 
     # -------------------- block helpers --------------------
+    # Static block shells: each block is a shallow copy with only its body filled in
+    _PARAGRAPH_SHELL = {"object": "block", "type": "paragraph", "paragraph": None}
+    _HEADING_2_SHELL = {"object": "block", "type": "heading_2", "heading_2": None}
+    _TOGGLE_SHELL = {"object": "block", "type": "toggle", "toggle": None}
+
     @staticmethod
     def _rt(text: str) -> List[Dict[str, Any]]:
         return [{"type": "text", "text": {"content": text}}]
 
+    def _paragraph(self, text: str) -> Dict[str, Any]:
+        block = self._PARAGRAPH_SHELL.copy()
+        block["paragraph"] = {"rich_text": self._rt(text)}
+        return block
+
     def _heading_2(self, text: str) -> Dict[str, Any]:
-        return {
-            "object": "block",
-            "type": "heading_2",
-            "heading_2": {"rich_text": self._rt(text[:2000])},
-        }
+        block = self._HEADING_2_SHELL.copy()
+        block["heading_2"] = {"rich_text": self._rt(_clip(text, 2000))}
+        return block
 
     def _toggle(self, title: str, children: List[Dict[str, Any]]) -> Dict[str, Any]:
-        # Note: toggle children may also be large; create_page appends in batches
-        # Put the first batch inside the toggle because Notion supports nested children
-        return {
-            "object": "block",
-            "type": "toggle",
-            "toggle": {
-                "rich_text": self._rt(title[:2000]),
-                "children": children[:100],  # Seed the first batch; append the rest later at the page level
-            },
-        }
+        # Note: toggle children may also be large; _split_children sends the first
+        # 100 with the page and create_page appends the rest to the toggle itself
+        block = self._TOGGLE_SHELL.copy()
+        block["toggle"] = {"rich_text": self._rt(_clip(title, 2000)), "children": children}
+        return block
 
     def _paragraph_blocks(self, text: str) -> List[Dict[str, Any]]:
         """
         Split long text into multiple paragraph blocks.
-        - Keep each paragraph content <= 1800 characters for safety
+        - Pack each paragraph up to Notion's 2000-character rich_text limit
         - Blank lines force a paragraph break
         """
-        max_len = 1800
+        max_len = 2000
         lines = text.splitlines()
 
         blocks: List[Dict[str, Any]] = []
-        buf = ""
+        # Pending lines and their joined length ("\n" separators included);
+        # joined once per block instead of re-concatenating on every line
+        buf_parts: List[str] = []
+        buf_len = 0
 
         def flush():
-            nonlocal buf
+            nonlocal buf_len
+            buf = "\n".join(buf_parts)
+            buf_parts.clear()
+            buf_len = 0
             if not buf.strip():
-                buf = ""
                 return
-            blocks.append({
-                "object": "block",
-                "type": "paragraph",
-                "paragraph": {"rich_text": self._rt(buf[:2000])},
-            })
-            buf = ""
+            assert len(buf) <= max_len
+            blocks.append(self._paragraph(buf))
 
         for line in lines:
             if not line.strip():
                 flush()
                 continue
 
-            if len(buf) + len(line) + (1 if buf else 0) <= max_len:
-                buf = (buf + "\n" + line) if buf else line
+            added = len(line) + (1 if buf_parts else 0)
+            if buf_len + added <= max_len:
+                buf_parts.append(line)
+                buf_len += added
             else:
                 flush()
                 # Hard-split lines that are too long
                 while len(line) > max_len:
                     chunk, line = line[:max_len], line[max_len:]
-                    blocks.append({
-                        "object": "block",
-                        "type": "paragraph",
-                        "paragraph": {"rich_text": self._rt(chunk)},
-                    })
-                buf = line
+                    blocks.append(self._paragraph(chunk))
+                if line:
+                    buf_parts.append(line)
+                    buf_len = len(line)
 
         flush()
         return blocks
 
+    def _paragraph_blocks_from_iter(self, segments: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        Pack transcript segments into paragraph blocks as they arrive.
+        - Segments are space-joined up to the 2000-character limit, so a block
+          only breaks mid-segment when one segment alone exceeds it
+        - Accepts any iterable, including a live transcription generator
+        """
+        max_len = 2000
+
+        blocks: List[Dict[str, Any]] = []
+        buf_parts: List[str] = []
+        buf_len = 0
+
+        for segment in segments:
+            segment = segment.strip()
+            if not segment:
+                continue
+
+            added = len(segment) + (1 if buf_parts else 0)
+            if buf_len + added <= max_len:
+                buf_parts.append(segment)
+                buf_len += added
+                continue
+
+            if buf_parts:
+                blocks.append(self._paragraph(" ".join(buf_parts)))
+            # Hard-split segments that are too long
+            while len(segment) > max_len:
+                chunk, segment = segment[:max_len], segment[max_len:]
+                blocks.append(self._paragraph(chunk))
+            buf_parts = [segment]
+            buf_len = len(segment)
+
+        if buf_parts:
+            blocks.append(self._paragraph(" ".join(buf_parts)))
+        return blocks
+
     # -------------------- Query / deduplication --------------------
     def query_database(self, filter_dict: Optional[Dict] = None, page_size: int = 100) -> List[Dict]:
         try:
-            resp = self.client.databases.query(
+            resp = self._request(
+                "databases.query",
                 database_id=self.database_id,
                 filter=filter_dict,
                 page_size=page_size
@@ -321,39 +939,222 @@ class NotionWriter:
     def check_duplicate(self, url: str) -> bool:
         """
         Check whether the URL already exists to avoid duplicates.
-        The current URL column uses rich_text, so we query with rich_text.equals.
+        URLs seen in Notion within URL_CACHE_MAX_AGE are answered from the
+        persistent URL cache, and while the cache is warm (fully refreshed within
+        URL_CACHE_MAX_AGE) a miss means "new". Otherwise the database is queried,
+        with the result kept for DUPLICATE_CACHE_TTL seconds, so pages deleted
+        in Notion can be written again. The filter matches the URL column's type.
         """
+        seen_at = self._url_cache.get(url)
+        if seen_at is not None and time.time() - seen_at < self.URL_CACHE_MAX_AGE:
+            return True
+        if seen_at is None and self._cache_is_warm():
+            return False
+
+        cached = self._dup_cache.get(url)
+        if cached and time.monotonic() - cached[0] < self.DUPLICATE_CACHE_TTL:
+            return cached[1]
+
         try:
             results = self.query_database({
                 "property": "URL",
-                "rich_text": {"equals": url}
+                self._url_type(): {"equals": url}
             })
-            return len(results) > 0
         except Exception:
-            return False
+            return seen_at is not None
+
+        exists = len(results) > 0
+        self._remember_duplicate(url, exists)
+        if exists:
+            self._record_written(url, results[0].get("id"))
+        else:
+            self._forget_written(url)
+        return exists
+
+    def prefetch_existing_urls(self) -> set:
+        """
+        Make sure the URL cache covers the whole database before a batch.
+        A warm persistent cache is used as is; otherwise refresh_cache() rescans.
+        """
+        if not self._cache_is_warm():
+            self.refresh_cache()
+        return set(self._url_cache)
+
+    def refresh_cache(self) -> set:
+        """
+        Rebuild the URL cache from a full paginated scan of the database and
+        persist it, replacing this database's previous entries.
+        """
+        db = self._request("databases.retrieve", database_id=self.database_id)
+        self._remember_schema(db)
+        url_prop = db.get("properties", {}).get("URL", {})
+
+        query: Dict[str, Any] = {"database_id": self.database_id, "page_size": 100}
+        if url_prop.get("id"):
+            # Only return the URL column to keep responses small
+            query["filter_properties"] = [url_prop["id"]]
+
+        pages: Dict[str, Optional[str]] = {}
+        while True:
+            resp = self._request("databases.query", **query)
+            for page in resp.get("results", []):
+                url = self._page_url(page)
+                if url:
+                    pages.setdefault(url, page.get("id"))
+            if not resp.get("has_more") or not resp.get("next_cursor"):
+                break
+            query["start_cursor"] = resp["next_cursor"]
+
+        now = time.time()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("BEGIN")
+                self._db.execute("DELETE FROM written WHERE database_id = ?", (self.database_id,))
+                self._db.executemany(
+                    "INSERT INTO written VALUES (?, ?, ?, ?)",
+                    ((self.database_id, url, page_id, now) for url, page_id in pages.items()),
+                )
+                self._db.execute("INSERT OR REPLACE INTO refreshed VALUES (?, ?)", (self.database_id, now))
+                self._db.execute("COMMIT")
+
+        self._url_cache = dict.fromkeys(pages, now)
+        self._cache_refreshed_at = now
+        self._dup_cache.clear()
+        print(f"📋 Cached {len(pages)} existing URLs from Notion")
+        return set(self._url_cache)
+
+    @staticmethod
+    def _page_url(page: Dict[str, Any]) -> str:
+        """Read the URL column from a page, whether it is rich_text or url typed."""
+        prop = page.get("properties", {}).get("URL") or {}
+        if prop.get("type") == "url":
+            return (prop.get("url") or "").strip()
+        return "".join(t.get("plain_text", "") for t in prop.get("rich_text") or []).strip()
+
+    def _remember_duplicate(self, url: Optional[str], exists: bool) -> None:
+        """Record a duplicate-check result in the TTL cache."""
+        url = str(url or "").strip()
+        if not url:
+            return
+        self._dup_cache.pop(url, None)
+        if len(self._dup_cache) >= self.DUPLICATE_CACHE_SIZE:
+            # Evict the least recently stored entry (dicts keep insertion order)
+            self._dup_cache.pop(next(iter(self._dup_cache)))
+        self._dup_cache[url] = (time.monotonic(), exists)
 
 
 class MockNotionWriter:
-    """Mock writer used when notion_client is unavailable; saves JSON locally."""
+    """
+    Mock writer used when notion_client is unavailable; saves JSON locally.
+    Pages are appended to a JSON Lines file (one record per line), so each
+    write costs O(1) instead of rewriting everything saved so far. Only the
+    URLs are kept in memory (for check_duplicate); dump_full() exports a JSON array.
+    """
+
+    OUTPUT_FILE = "notion_mock_output.jsonl"
+    COMPACT_FILE = "notion_mock_output.json"
 
     def __init__(self, *args, **kwargs):
-        self.data_store: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()  # Batch runs may write from several threads
+        self._fp = None  # Opened on the first write
+        self._url_index: Set[str] = self._load_url_index()
         print("📝 Using MockNotionWriter (test mode, nothing will be written to Notion)")
 
+    def _load_url_index(self) -> Set[str]:
+        """Rebuild the duplicate-check index once from earlier runs' output."""
+        index: Set[str] = set()
+        if not Path(self.OUTPUT_FILE).exists():
+            return index
+        with open(self.OUTPUT_FILE, "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    url = _loads(line).get("url")
+                except ValueError:
+                    continue  # Skip a truncated last line
+                if url:
+                    index.add(url)
+        return index
+
     def test_connection(self) -> bool:
         print("✅ Mock connection successful")
         return True
 
     def create_page(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        self.data_store.append(data)
-        output_file = "notion_mock_output.json"
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(self.data_store, f, ensure_ascii=False, indent=2)
-        print(f"✅ Saved locally: {output_file}")
+        # transcript_segments only shapes Notion blocks; the joined transcript is kept
+        line = _dumps_line({k: v for k, v in data.items() if k != "transcript_segments"})
+        url = data.get("url")
+        with self._lock:
+            if url:
+                self._url_index.add(url)
+            if self._fp is None:
+                self._fp = open(self.OUTPUT_FILE, "ab", buffering=1 << 20)
+                atexit.register(self.close)
+                if self._fp.tell() and not self._ends_with_newline():
+                    self._fp.write(b"\n")  # Terminate a truncated last line so this record stays readable
+            self._fp.write(line)
+        print(f"✅ Saved locally: {self.OUTPUT_FILE}")
         return {"id": "mock-page-id", "data": data}
 
+    def _ends_with_newline(self) -> bool:
+        with open(self.OUTPUT_FILE, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def close(self) -> None:
+        """Flush buffered records and close the output file."""
+        with self._lock:
+            if self._fp is not None:
+                self._fp.close()
+                self._fp = None
+
+    @classmethod
+    def compact(cls, output_file: Optional[str] = None) -> int:
+        """
+        Rebuild a JSON array file from the JSON Lines output (offline export).
+
+        Returns:
+            The number of records exported
+        """
+        records = []
+        if Path(cls.OUTPUT_FILE).exists():
+            with open(cls.OUTPUT_FILE, "rb") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        records.append(_loads(line))
+                    except ValueError:
+                        continue  # Skip a truncated last line
+        output_file = output_file or cls.COMPACT_FILE
+        if orjson is not None:
+            Path(output_file).write_bytes(orjson.dumps(records, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(output_file, "w", encoding="utf-8") as f:
+                json.dump(records, f, ensure_ascii=False, indent=2)
+        print(f"✅ Exported {len(records)} records: {output_file}")
+        return len(records)
+
+    def dump_full(self, output_file: Optional[str] = None) -> int:
+        """Flush pending writes, then consolidate everything written so far into a JSON array file."""
+        with self._lock:
+            if self._fp is not None:
+                self._fp.flush()
+        return self.compact(output_file)
+
+    def create_pages(self, items: List[Dict[str, Any]]) -> List[Any]:
+        return [self.create_page(data) for data in items]
+
+    def prefetch_existing_urls(self) -> set:
+        return set(self._url_index)
+
+    def refresh_cache(self) -> set:
+        self._url_index = self._load_url_index()
+        return set(self._url_index)
+
     def check_duplicate(self, url: str) -> bool:
-        return any(item.get("url") == url for item in self.data_store)
+        return url in self._url_index
 
 
 def get_writer(token: Optional[str] = None, database_id: Optional[str] = None) -> Any:
@@ -362,7 +1163,7 @@ def get_writer(token: Optional[str] = None, database_id: Optional[str] = None) -
     - If notion_client is available and token/database_id are valid => NotionWriter
     - Otherwise => MockNotionWriter
     """
-    if not USE_NOTION_CLIENT:
+    if _bootstrap() is None:
         return MockNotionWriter()
 
     try:
@@ -373,6 +1174,11 @@ def get_writer(token: Optional[str] = None, database_id: Optional[str] = None) -
 
 
 if __name__ == "__main__":
+    # ======= Export the mock JSON Lines output as a single JSON array =======
+    if "--compact" in sys.argv[1:]:
+        MockNotionWriter.compact()
+        sys.exit(0)
+
     # ======= Example: uncomment the next two lines for a real Notion write, and make sure .env is configured =======
     # writer = NotionWriter()
     # writer.test_connection()
@@ -5,10 +5,40 @@ Generate summaries with a local Ollama LLM
 """
 
 import gc
+import os
 import json
+import asyncio
+from functools import lru_cache
 import torch
 import ollama
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple, Any
+
+# Optional speedup: orjson parses the (usually pure-JSON) model output faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+@lru_cache(maxsize=2)
+def _load_tokenizer(name: Optional[str]):
+    """Load a Hugging Face tokenizer once; None when unset, or `tokenizers` or the files are unavailable."""
+    if not name or name.lower() == "none":
+        return None
+    try:
+        from tokenizers import Tokenizer
+        return Tokenizer.from_pretrained(name)
+    except Exception as e:
+        print(f"⚠️ Tokenizer {name} unavailable ({e}); truncating by characters")
+        return None
+
+
+@lru_cache(maxsize=8)
+def _prompt_tokens(tokenizer_name: str, system_prompt: str, content_label: str) -> int:
+    """Tokens used by the prompt around the transcript (plus headroom for the chat template)."""
+    tokenizer = _load_tokenizer(tokenizer_name)
+    overhead = Summarizer._build_prompt(system_prompt, content_label, "...")
+    return len(tokenizer.encode(overhead, add_special_tokens=False).ids) + 64
 
 
 class Summarizer:
@@ -50,6 +80,17 @@ class Summarizer:
 
     # Fallback model used when auto-detection fails
     FALLBACK_MODEL = "qwen2.5:7b-instruct-q4_K_M"
+
+    # How long Ollama keeps the model resident between requests
+    KEEP_ALIVE = "10m"
+
+    # Token-aware truncation (opt-in via LLM_TOKENIZER, a Hugging Face tokenizer
+    # matching the Ollama model): the transcript gets whatever CONTEXT_TOKENS (sent
+    # as num_ctx) leaves after the prompt and MAX_OUTPUT_TOKENS (num_predict),
+    # in place of the max_length character cut
+    CONTEXT_TOKENS = 8192
+    MAX_OUTPUT_TOKENS = 1000
+    TOKENIZER_NAME = os.getenv("LLM_TOKENIZER") or None
     
     SYSTEM_PROMPT = """你是一个专业的视频内容分析师。你的任务是对视频 transcript（转录文本）进行总结。
 
@@ -93,15 +134,15 @@ class Summarizer:
 - 不要输出 markdown 代码块"""
 
     @classmethod
-    def detect_model(cls) -> str:
+    def detect_model(cls, client: Optional["ollama.Client"] = None) -> str:
         """Automatically select the best available Ollama model."""
         # Check environment-configured models first
-        import os
         primary_model = os.getenv("LLM_MODEL")
         fallback_model = os.getenv("LLM_MODEL_FALLBACK")
         
         try:
-            raw = getattr(ollama.list(), 'models', None) or ollama.list().get('models', [])
+            listing = (client or ollama).list()
+            raw = getattr(listing, 'models', None) or listing.get('models', [])
             installed = []
             for m in raw:
                 name = (getattr(m, 'model', None) or getattr(m, 'name', None)
@@ -152,9 +193,12 @@ class Summarizer:
         Args:
             model: Ollama model name; auto-detected when omitted
         """
-        self.model = model or self.detect_model()
+        # One client for every call: its HTTP connection is reused between requests
+        self.ollama = ollama.Client(host=os.getenv("OLLAMA_HOST", "http://127.0.0.1:11434"))
+        self.model = model or self.detect_model(self.ollama)
 
-    def _build_prompt(self, system_prompt: str, content_label: str, transcript: str) -> str:
+    @staticmethod
+    def _build_prompt(system_prompt: str, content_label: str, transcript: str) -> str:
         """Build a shared prompt that requires JSON-only output."""
         return (
             f"{system_prompt}\n\n"
@@ -179,12 +223,21 @@ class Summarizer:
         if not text:
             raise ValueError("The model returned an empty response")
 
+        # Structured output is normally the bare object: parse it in one go
+        if orjson is not None and text[0] == '{':
+            try:
+                parsed = orjson.loads(text)
+                if isinstance(parsed, dict):
+                    return parsed
+            except orjson.JSONDecodeError:
+                pass
+
         decoder = json.JSONDecoder()
         for index, char in enumerate(text):
             if char != '{':
                 continue
             try:
-                parsed, _ = decoder.raw_decode(text[index:])
+                parsed, _ = decoder.raw_decode(text, index)
                 if isinstance(parsed, dict):
                     return parsed
             except json.JSONDecodeError:
@@ -192,35 +245,37 @@ class Summarizer:
 
         raise ValueError("Unable to extract a valid JSON object from the response")
 
+    def _generate_kwargs(self, model: str, prompt_text: str, structured: bool) -> Dict[str, Any]:
+        """Arguments for a summary request; shared by the sync and async clients."""
+        options: Dict[str, Any] = {"temperature": 0, "num_predict": self.MAX_OUTPUT_TOKENS}
+        # Only widen the context when the input was cut to fit it; a different
+        # num_ctx than the server default makes Ollama reload the model
+        if _load_tokenizer(self.TOKENIZER_NAME) is not None:
+            options["num_ctx"] = self.CONTEXT_TOKENS
+        kwargs: Dict[str, Any] = {
+            "model": model,
+            "prompt": prompt_text,
+            "keep_alive": self.KEEP_ALIVE,
+            "options": options,
+        }
+        if structured:
+            kwargs["format"] = self.RESPONSE_SCHEMA
+        return kwargs
+
     def _generate_structured(self, model: str, prompt_text: str) -> Dict:
         """Prefer Ollama's structured-output support when available."""
-        response = ollama.generate(
-            model=model,
-            prompt=prompt_text,
-            format=self.RESPONSE_SCHEMA,
-            options={
-                "temperature": 0,
-                "num_predict": 1000,
-            }
-        )
+        response = self.ollama.generate(**self._generate_kwargs(model, prompt_text, True))
         return self._parse_json_response(response.response)
 
     def _generate_unstructured(self, model: str, prompt_text: str) -> Dict:
         """Fall back to plain text and extract JSON manually when needed."""
-        response = ollama.generate(
-            model=model,
-            prompt=prompt_text,
-            options={
-                "temperature": 0,
-                "num_predict": 1000,
-            }
-        )
+        response = self.ollama.generate(**self._generate_kwargs(model, prompt_text, False))
         return self._parse_json_response(response.response)
     
     def check_ollama(self) -> bool:
         """Check whether the Ollama service is available."""
         try:
-            ollama.list()
+            self.ollama.list()
             return True
         except Exception as e:
             print(f"❌ Ollama connection failed: {e}")
@@ -230,7 +285,7 @@ class Summarizer:
     def check_model_loaded(self) -> bool:
         """Check whether the target model has already been downloaded."""
         try:
-            models = ollama.list()
+            models = self.ollama.list()
             # Support both old and new ollama client response shapes
             raw = getattr(models, 'models', None) or models.get('models', [])
             model_names = []
@@ -261,9 +316,10 @@ class Summarizer:
         print(f"🔥 Warming up model: {self.model}")
         try:
             # Simple warm-up request
-            ollama.generate(
+            self.ollama.generate(
                 model=self.model,
                 prompt="你好",
+                keep_alive=self.KEEP_ALIVE,
                 options={"num_predict": 1}
             )
             print("✅ Model warm-up complete")
@@ -281,38 +337,18 @@ class Summarizer:
         
         Args:
             transcript: Transcript text
-            max_length: Maximum input length in characters
+            max_length: Maximum input length in characters (when no LLM_TOKENIZER is set)
             content_type: Content type ('video' or 'image_text')
             
         Returns:
             A dictionary containing summary, key points, tags, and related fields
         """
-        # Truncate overly long text
-        if len(transcript) > max_length:
-            print(f"📄 Text is too long ({len(transcript)} chars). Truncating to {max_length} chars")
-            transcript = transcript[:max_length] + "..."
-        
-        # Select the appropriate prompt template
-        if content_type == 'image_text':
-            system_prompt = self.IMAGE_TEXT_PROMPT
-            content_label = "图文笔记内容"
-        else:
-            system_prompt = self.SYSTEM_PROMPT
-            content_label = "视频转录文本"
-        
+        transcript, prompt_text = self._prepare(transcript, max_length, content_type)
         print(f"🧠 Starting summary generation (model: {self.model}, type: {content_type})")
 
-        import os
-        fallback_model = os.getenv("LLM_MODEL_FALLBACK")
-        prompt_text = self._build_prompt(system_prompt, content_label, transcript)
-
-        model_candidates = [self.model]
-        if fallback_model and fallback_model not in model_candidates:
-            model_candidates.append(fallback_model)
-
         errors = []
 
-        for model_name in model_candidates:
+        for model_name in self._model_candidates():
             self.model = model_name
 
             try:
@@ -338,34 +374,151 @@ class Summarizer:
             errors.append(f"fallback summary: {fallback_error}")
             raise Exception("Summary generation failed: " + " | ".join(errors))
     
+    def _prepare(self, transcript: str, max_length: int, content_type: str) -> Tuple[str, str]:
+        """
+        Truncate the transcript and build the prompt for its content type.
+        With a tokenizer the transcript is cut to whatever fits in CONTEXT_TOKENS
+        next to the prompt and MAX_OUTPUT_TOKENS; otherwise to max_length characters.
+
+        Returns:
+            (possibly truncated transcript, prompt text)
+        """
+        # Select the appropriate prompt template
+        if content_type == 'image_text':
+            system_prompt = self.IMAGE_TEXT_PROMPT
+            content_label = "图文笔记内容"
+        else:
+            system_prompt = self.SYSTEM_PROMPT
+            content_label = "视频转录文本"
+
+        # Truncate overly long text
+        tokenizer = _load_tokenizer(self.TOKENIZER_NAME)
+        if tokenizer is not None:
+            budget = (self.CONTEXT_TOKENS - self.MAX_OUTPUT_TOKENS
+                      - _prompt_tokens(self.TOKENIZER_NAME, system_prompt, content_label))
+            if budget <= 0:
+                print(f"⚠️ Prompt and output budget exceed CONTEXT_TOKENS ({self.CONTEXT_TOKENS}); dropping the transcript")
+                transcript = "..." if transcript else transcript
+            else:
+                encoding = tokenizer.encode(transcript, add_special_tokens=False)
+                if len(encoding.ids) > budget:
+                    cut = encoding.offsets[budget - 1][1]
+                    print(f"📄 Text is too long ({len(encoding.ids)} tokens). Truncating to {budget} tokens ({cut} chars)")
+                    transcript = transcript[:cut] + "..."
+        elif len(transcript) > max_length:
+            print(f"📄 Text is too long ({len(transcript)} chars). Truncating to {max_length} chars")
+            transcript = transcript[:max_length] + "..."
+
+        return transcript, self._build_prompt(system_prompt, content_label, transcript)
+
+    def _model_candidates(self) -> List[str]:
+        """The configured model, then LLM_MODEL_FALLBACK if it differs."""
+        fallback_model = os.getenv("LLM_MODEL_FALLBACK")
+        model_candidates = [self.model]
+        if fallback_model and fallback_model not in model_candidates:
+            model_candidates.append(fallback_model)
+        return model_candidates
+
+    def summarize_many(self, transcripts: List[str], max_length: int = 2000,
+                       content_type: str = 'video') -> List[Any]:
+        """
+        Summarize several transcripts concurrently (sync wrapper around asummarize_many).
+
+        Returns:
+            One result dict per transcript, or the Exception raised for it, in input order
+        """
+        return asyncio.run(self.asummarize_many(transcripts, max_length, content_type))
+
+    async def asummarize_many(self, transcripts: List[str], max_length: int = 2000,
+                              content_type: str = 'video') -> List[Any]:
+        """
+        Summarize several transcripts concurrently. At most OLLAMA_NUM_PARALLEL
+        (default 4) requests are in flight, matching how many Ollama serves at once.
+        """
+        sem = asyncio.Semaphore(int(os.getenv("OLLAMA_NUM_PARALLEL") or 4))
+        # Created per call: an AsyncClient's connections belong to one event loop
+        aclient = ollama.AsyncClient(host=os.getenv("OLLAMA_HOST", "http://127.0.0.1:11434"))
+
+        async def one(transcript: str) -> Dict:
+            async with sem:
+                return await self._asummarize_one(aclient, transcript, max_length, content_type)
+
+        print(f"🧠 Summarizing {len(transcripts)} items (model: {self.model}, type: {content_type})")
+        try:
+            return await asyncio.gather(*(one(t) for t in transcripts), return_exceptions=True)
+        finally:
+            # Close the pooled connections before the loop goes away (older ollama
+            # releases have no AsyncClient.close(), so close its httpx client directly)
+            await aclient._client.aclose()
+
+    async def _asummarize_one(self, aclient: "ollama.AsyncClient", transcript: str,
+                              max_length: int, content_type: str) -> Dict:
+        """Async counterpart of summarize(); leaves self.model untouched."""
+        transcript, prompt_text = self._prepare(transcript, max_length, content_type)
+        errors = []
+
+        for model_name in self._model_candidates():
+            for structured in (True, False):
+                try:
+                    response = await aclient.generate(**self._generate_kwargs(model_name, prompt_text, structured))
+                    return self._normalize_result(self._parse_json_response(response.response))
+                except Exception as e:
+                    errors.append(f"{model_name} {'structured' if structured else 'text'}: {e}")
+
+        try:
+            response = await aclient.generate(**self._fallback_kwargs(transcript))
+            return self._fallback_result(response.response)
+        except Exception as fallback_error:
+            errors.append(f"fallback summary: {fallback_error}")
+            raise Exception("Summary generation failed: " + " | ".join(errors))
+
+    def _fallback_kwargs(self, transcript: str) -> Dict[str, Any]:
+        """Arguments for the plain-text fallback summary request."""
+        return {
+            "model": self.model,
+            "keep_alive": self.KEEP_ALIVE,
+            "prompt": f"请用中文总结以下视频转录内容，提取3-5个要点:\n\n{transcript[:1500]}",
+            "options": {"temperature": 0.3, "num_predict": 500},
+        }
+
+    @staticmethod
+    def _fallback_result(text: str) -> Dict:
+        return {
+            'summary': text,
+            'key_points': [],
+            'tags': [],
+            'category': '未分类',
+            'sentiment': 'neutral',
+            'language': 'zh',
+        }
+
     def _fallback_summarize(self, transcript: str) -> Dict:
         """Fallback summarization method used when JSON parsing fails."""
         print("🔄 Using fallback summarization...")
         
         try:
-            response = ollama.generate(
-                model=self.model,
-                prompt=f"请用中文总结以下视频转录内容，提取3-5个要点:\n\n{transcript[:1500]}",
-                options={"temperature": 0.3, "num_predict": 500}
-            )
-            
-            return {
-                'summary': response.response,
-                'key_points': [],
-                'tags': [],
-                'category': '未分类',
-                'sentiment': 'neutral',
-                'language': 'zh',
-            }
+            response = self.ollama.generate(**self._fallback_kwargs(transcript))
+            return self._fallback_result(response.response)
         except Exception as e:
             raise Exception(f"Fallback summarization also failed: {str(e)}")
     
-    def unload_model(self):
-        """Release VRAM by clearing caches."""
+    def unload_model(self, verify: bool = False):
+        """
+        Release VRAM: ask Ollama to evict the model now, then clear caches.
+        
+        Args:
+            verify: Block until pending GPU work finishes (e.g. before measuring VRAM)
+        """
+        try:
+            # keep_alive=0 unloads immediately instead of after KEEP_ALIVE
+            self.ollama.generate(model=self.model, keep_alive=0)
+        except Exception as e:
+            print(f"⚠️ Failed to unload model from Ollama: {e}")
         gc.collect()
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
-            torch.cuda.synchronize()
+            if verify:
+                torch.cuda.synchronize()
         print("✅ LLM VRAM released")
     
     @staticmethod
@@ -5,31 +5,76 @@ Run local speech-to-text with faster-whisper
 """
 
 import gc
+import threading
 import torch
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 from faster_whisper import WhisperModel
 
+# Batched decoding of VAD segments (faster-whisper >= 1.1); sequential decoding otherwise
+try:
+    from faster_whisper import BatchedInferencePipeline
+except ImportError:
+    BatchedInferencePipeline = None
+
 
 class WhisperTranscriber:
     """Local Whisper transcriber."""
     
     # Model defaults: the small model is a good fit for 8GB VRAM
     MODEL_SIZE = "small"
-    COMPUTE_TYPE = "float16"  # float16 uses about 2GB on an RTX 5060
+    COMPUTE_TYPE = "int8_float16"  # INT8 weights + FP16 compute: ~1.2GB for small, faster than float16
+    # Tried in order on CUDA when the preferred type is not supported by the GPU/backend
+    CUDA_COMPUTE_FALLBACKS = ("int8_float16", "float16", "int8")
+
+    # Process-wide model cache shared by every transcriber instance:
+    # (model_size, device, compute_type, download_root) -> model, plus how many
+    # instances currently hold it. The last unload_model() frees the VRAM unless it
+    # passes keep_resident=True; such an idle model makes the next load of the same
+    # key free and is evicted when a different key is loaded or on a freeing unload.
+    _MODEL_CACHE: Dict[Tuple, WhisperModel] = {}
+    _MODEL_REFS: Dict[Tuple, int] = {}
+    _CACHE_LOCK = threading.Lock()
+    _UNSUPPORTED_COMPUTE: set = set()  # (device, compute_type) pairs that failed to load
+
+    # Beam width per quality mode: greedy decoding is ~4x cheaper on the decoder and
+    # near-lossless for transcripts that only feed the summarizer
+    QUALITY_BEAM_SIZES = {"fast": 1, "accurate": 5}
+
+    # Standalone Silero VAD used by pre_vad=True (torch.hub repo), loaded once per process
+    PRE_VAD_REPO = "snakers4/silero-vad"
+    VAD_SAMPLING_RATE = 16000
+    _VAD = None  # (model, get_speech_timestamps)
+
+    # Speech segments decoded together on the GPU (BatchedInferencePipeline); 1 disables batching
+    BATCH_SIZE = 16
     
-    def __init__(self, model_path: Optional[str] = None, model_size: Optional[str] = None):
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        model_size: Optional[str] = None,
+        compute_type: Optional[str] = None
+    ):
         """
         Initialize the transcriber.
         
         Args:
             model_path: Custom model download path (optional)
             model_size: Whisper model size override
+            compute_type: Preferred CUDA compute type (defaults to COMPUTE_TYPE)
         """
         self.model = None
         self.model_path = model_path
         self.model_size = model_size or self.MODEL_SIZE
+        self.compute_type = compute_type or self.COMPUTE_TYPE
         self.last_device = None
         self.last_compute_type = None
+        self._cache_key: Optional[Tuple] = None
+        self._pipeline = None  # BatchedInferencePipeline around self.model, built on first use
+    
+    @property
+    def loaded(self) -> bool:
+        """Whether a Whisper model is currently loaded."""
+        return self.model is not None
     
     def load_model(self, device: str = None, compute_type: Optional[str] = None):
         """
@@ -58,31 +103,73 @@ class WhisperTranscriber:
                 print("🔍 Auto-detected: CPU")
         
         # Select the compute type automatically based on the device
-        if compute_type is None:
-            compute_type = "float16" if device == "cuda" else "int8"
+        if compute_type is not None:
+            candidates = [compute_type]
+        elif device == "cuda":
+            candidates = [self.compute_type]
+            candidates += [c for c in self.CUDA_COMPUTE_FALLBACKS if c not in candidates]
+        else:
+            candidates = ["int8"]
+        candidates = [c for c in candidates if (device, c) not in self._UNSUPPORTED_COMPUTE] or candidates[-1:]
+
+        for i, candidate in enumerate(candidates):
+            try:
+                self._load_cached(device, candidate)
+                break
+            except ValueError as e:
+                # Raised when the device/backend lacks efficient support for the type
+                if i == len(candidates) - 1:
+                    raise
+                self._UNSUPPORTED_COMPUTE.add((device, candidate))
+                print(f"⚠️ Compute type {candidate} unsupported ({e}); trying {candidates[i + 1]}")
 
+    def _load_cached(self, device: str, compute_type: str):
+        """Load (or reuse from the process-wide cache) the model for one device/compute type."""
         self.last_device = device
         self.last_compute_type = compute_type
         
+        key = (self.model_size, device, compute_type, self.model_path)
+        with self._CACHE_LOCK:
+            cached = self._MODEL_CACHE.get(key)
+            if cached is not None:
+                self.model = cached
+                self._cache_key = key
+                self._MODEL_REFS[key] = self._MODEL_REFS.get(key, 0) + 1
+                print(f"✅ Reusing loaded Whisper {self.model_size} model ({device}, {compute_type})")
+                return
+            # Make room: drop idle models kept from earlier loads of other keys
+            idle = [k for k in self._MODEL_CACHE if not self._MODEL_REFS.get(k)]
+            for k in idle:
+                self._MODEL_CACHE.pop(k)
+        if idle:
+            print("🔄 Releasing idle Whisper model...")
+            self._release_vram()
+        
         print(f"📥 Loading Whisper {self.model_size} model...")
         print(f"🖥️ Device: {device}")
         print(f"📊 Compute type: {compute_type}")
         
         try:
-            self.model = WhisperModel(
+            model = WhisperModel(
                 self.model_size,
                 device=device,
                 compute_type=compute_type,
                 download_root=self.model_path
             )
             print("✅ Model loaded")
-            
-            # Print estimated VRAM usage
-            self._print_vram_usage()
-            
         except Exception as e:
             print(f"❌ Model loading failed: {e}")
             raise
+
+        with self._CACHE_LOCK:
+            # Another instance may have finished loading the same model meanwhile
+            self.model = self._MODEL_CACHE.setdefault(key, model)
+            self._MODEL_REFS[key] = self._MODEL_REFS.get(key, 0) + 1
+            self._cache_key = key
+        del model
+        
+        # Print estimated VRAM usage
+        self._print_vram_usage()
     
     def _print_vram_usage(self):
         """Print estimated VRAM usage."""
@@ -95,7 +182,10 @@ class WhisperTranscriber:
         self,
         audio_path: str,
         language: Optional[str] = None,
-        task: str = "transcribe"
+        task: str = "transcribe",
+        beam_size: int = 1,
+        quality_mode: Optional[str] = None,
+        pre_vad: bool = False
     ) -> Dict:
         """
         Transcribe an audio file.
@@ -104,6 +194,9 @@ class WhisperTranscriber:
             audio_path: Audio file path
             language: Language code (None = auto-detect)
             task: "transcribe" or "translate"
+            beam_size: Decoder beam width (1 = greedy)
+            quality_mode: "fast" or "accurate"; overrides beam_size when given
+            pre_vad: Locate speech with Silero VAD first and decode only those regions
             
         Returns:
             A dictionary containing text, segments, and language metadata
@@ -117,16 +210,11 @@ class WhisperTranscriber:
         if language is None:
             language = "zh"  # Default to Chinese
         
+        beam_size = self._beam_size(beam_size, quality_mode)
+        
         try:
             # Run transcription
-            segments, info = self.model.transcribe(
-                audio_path,
-                language=language,
-                task=task,
-                beam_size=5,
-                vad_filter=True,  # Voice activity detection
-                vad_parameters=dict(min_silence_duration_ms=500)
-            )
+            segments, info = self._decode(audio_path, language, task, beam_size, pre_vad)
             
             # Collect all transcription segments
             transcript_segments = []
@@ -158,23 +246,118 @@ class WhisperTranscriber:
         except Exception as e:
             raise Exception(f"Transcription failed: {str(e)}")
     
-    def unload_model(self):
-        """Unload the model and release VRAM."""
-        if self.model is not None:
+    def _beam_size(self, beam_size: int, quality_mode: Optional[str]) -> int:
+        """Resolve the decoder beam width, letting quality_mode override beam_size."""
+        if quality_mode is None:
+            return beam_size
+        if quality_mode not in self.QUALITY_BEAM_SIZES:
+            raise ValueError(f"Unknown quality_mode: {quality_mode!r} (expected 'fast' or 'accurate')")
+        return self.QUALITY_BEAM_SIZES[quality_mode]
+    
+    def _decode(self, audio_path: str, language: str, task: str, beam_size: int, pre_vad: bool = False):
+        """Start decoding; returns faster-whisper's lazy (segments, info) pair."""
+        options = dict(
+            language=language,
+            task=task,
+            beam_size=beam_size,
+            vad_filter=True,  # Voice activity detection
+            vad_parameters=dict(min_silence_duration_ms=500)
+        )
+        clips = self._speech_clips(audio_path) if pre_vad else None
+        if clips:
+            # Decode only the speech regions; timestamps stay relative to the original audio
+            options.update(vad_filter=False, clip_timestamps=clips)
+            options.pop("vad_parameters")
+            return self.model.transcribe(audio_path, **options)
+        pipeline = self._batched_pipeline()
+        if pipeline is not None:
+            return pipeline.transcribe(audio_path, batch_size=self.BATCH_SIZE, **options)
+        return self.model.transcribe(audio_path, **options)
+    
+    @classmethod
+    def _silero_vad(cls):
+        """Load the standalone Silero VAD model once per process."""
+        if cls._VAD is None:
+            model, utils = torch.hub.load(cls.PRE_VAD_REPO, "silero_vad", trust_repo=True)
+            cls._VAD = (model, utils[0])  # utils[0] is get_speech_timestamps
+        return cls._VAD
+    
+    def _speech_clips(self, audio_path: str) -> Optional[List[float]]:
+        """
+        Find speech regions with Silero VAD.
+        
+        Returns:
+            Flat [start, end, start, end, ...] list in seconds for faster-whisper's
+            clip_timestamps, or None to fall back to the built-in VAD filter
+        """
+        try:
+            from faster_whisper import decode_audio
+            model, get_speech_timestamps = self._silero_vad()
+            sr = self.VAD_SAMPLING_RATE
+            audio = decode_audio(audio_path, sampling_rate=sr)
+            stamps = get_speech_timestamps(torch.from_numpy(audio), model, sampling_rate=sr)
+        except Exception as e:
+            print(f"⚠️ Silero pre-VAD unavailable ({e}); using the built-in VAD filter")
+            return None
+        
+        if not stamps:
+            return None
+        speech = sum(s["end"] - s["start"] for s in stamps) / max(len(audio), 1)
+        print(f"🔇 Pre-VAD: {len(stamps)} speech regions, {speech:.0%} of the audio")
+        return [t / sr for s in stamps for t in (s["start"], s["end"])]
+    
+    def _batched_pipeline(self):
+        """Batched decoder for the loaded model on CUDA, or None to decode sequentially."""
+        if BatchedInferencePipeline is None or self.BATCH_SIZE <= 1 or self.last_device != "cuda":
+            return None
+        if self._pipeline is None:
+            self._pipeline = BatchedInferencePipeline(model=self.model)
+        return self._pipeline
+    
+    def unload_model(self, verify: bool = False, keep_resident: bool = False):
+        """
+        Unload the model and release VRAM once no other transcriber shares it.
+        
+        Args:
+            verify: Wait for pending GPU work before reporting VRAM usage
+            keep_resident: Leave an unshared model cached (idle) for the next load
+                of the same size/device/compute type instead of freeing it
+        """
+        key, self._cache_key = self._cache_key, None
+        self.model = None
+        self._pipeline = None
+        with self._CACHE_LOCK:
+            if key is not None:
+                remaining = self._MODEL_REFS.get(key, 1) - 1
+                if remaining > 0:
+                    # Still used by another transcriber: leave it resident
+                    self._MODEL_REFS[key] = remaining
+                else:
+                    self._MODEL_REFS.pop(key, None)
+            idle = [k for k in self._MODEL_CACHE if not self._MODEL_REFS.get(k)]
+            if not keep_resident:
+                for k in idle:
+                    self._MODEL_CACHE.pop(k)
+        if keep_resident:
+            if key in idle:
+                print("💤 Whisper model kept resident for reuse")
+        elif idle:
             print("🔄 Releasing Whisper model...")
-            del self.model
-            self.model = None
-            
-            # Force garbage collection
-            gc.collect()
-            
-            # Clear the CUDA cache
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
+            self._release_vram(verify)
+    
+    def _release_vram(self, verify: bool = False):
+        """Collect freed models and hand their cached VRAM back to the driver."""
+        # Force garbage collection
+        gc.collect()
+        
+        # Clear the CUDA cache
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+            if verify:
                 torch.cuda.synchronize()
-            
-            print("✅ VRAM released")
-            self._print_vram_usage()
+        
+        print("✅ VRAM released")
+        self._print_vram_usage()
     
     def __enter__(self):
         """Context manager entry point."""
@@ -189,16 +372,18 @@ class WhisperTranscriber:
 def get_vram_requirement(model_size: str = "small") -> Dict:
     """
     Get the estimated VRAM requirement for each model size.
+    Estimates assume the default int8_float16 compute type on CUDA
+    (float16 needs roughly twice as much for the weights, e.g. ~2GB for small).
     
     Returns:
         A dictionary describing VRAM requirements
     """
     requirements = {
-        "tiny": {"vram": "~1GB", "speed": "最快", "accuracy": "最低"},
-        "base": {"vram": "~1GB", "speed": "快", "accuracy": "基础"},
-        "small": {"vram": "~2GB", "speed": "中等", "accuracy": "良好"},
-        "medium": {"vram": "~5GB", "speed": "较慢", "accuracy": "很好"},
-        "large": {"vram": "~10GB", "speed": "慢", "accuracy": "最佳"},
+        "tiny": {"vram": "~0.6GB", "speed": "最快", "accuracy": "最低"},
+        "base": {"vram": "~0.7GB", "speed": "快", "accuracy": "基础"},
+        "small": {"vram": "~1.2GB", "speed": "中等", "accuracy": "良好"},
+        "medium": {"vram": "~3GB", "speed": "较慢", "accuracy": "很好"},
+        "large": {"vram": "~5GB", "speed": "慢", "accuracy": "最佳"},
     }
     return requirements.get(model_size, requirements["small"])
 